@@ -1,25 +1,43 @@
 import socket
+import selectors
 import argparse
 import time
 import yaml # For YAML configuration
+try:
+    from yaml import CSafeLoader as YamlLoader # libyaml-backed, when available
+except ImportError:
+    from yaml import SafeLoader as YamlLoader
 import logging
-import pyproj # For UTM conversion
+try:
+    import pyproj # For UTM conversion (only needed with --precise)
+except ImportError:
+    pyproj = None
 import math
-import json
-from datetime import datetime, timezone # Added timezone for KST
+import os
+import re
+import sys
+from datetime import datetime, timezone, timedelta # Added timezone for KST
 from pathlib import Path
 import threading
-from collections import deque
+import queue
+from functools import lru_cache
+
+# Prefer a C JSON parser that accepts bytes directly; fall back to stdlib json
+try:
+    import orjson as _json
+except ImportError:
+    try:
+        import ujson as _json
+    except ImportError:
+        import json as _json
+_JSONDecodeError = getattr(_json, 'JSONDecodeError', ValueError)
 
-# --- Global ZoneInfo for KST (if available) ---
-KST_TZ = None
+# Only use Numba if available; the error kernel falls back to pure Python
 try:
-    from zoneinfo import ZoneInfo
-    KST_TZ = ZoneInfo("Asia/Seoul")
-    print("[Main] zoneinfo found, KST conversion enabled.")
+    from numba import njit
+    HAS_NUMBA = True
 except ImportError:
-    print("[Main] zoneinfo module not found. Timestamps will be in UTC or system local time if KST conversion fails.")
-    KST_TZ = timezone.utc # Fallback to UTC if zoneinfo is not available
+    HAS_NUMBA = False
 
 # --- Console Logger Setup ---
 console_logger = logging.getLogger('GNSSClientConsole')
@@ -31,6 +49,25 @@ ch.setFormatter(formatter)
 if not console_logger.hasHandlers():
     console_logger.addHandler(ch)
 
+# --- Projection Cache ---
+EARTH_MEAN_RADIUS_M = 6371008.8 # IUGG mean Earth radius
+LOCAL_APPROX_MAX_DEG = 0.01 # Beyond ~1 km from the ground truth, use the UTM projection instead
+
+UTM_ZONE_COUNT = 60
+
+@lru_cache(maxsize=UTM_ZONE_COUNT * 2) # Every zone in both hemispheres
+def _get_transformer(utm_zone, south):
+    """
+    Returns a cached WGS84 -> UTM transformer for the given zone and hemisphere.
+    The zone is spelled out as an extended transverse Mercator (etmerc)
+    projection, which stays accurate well beyond the 6 degree zone edges.
+    """
+    utm_crs = (
+        f"+proj=etmerc +lat_0=0 +lon_0={(utm_zone - 1) * 6 - 177} +k=0.9996 "
+        f"+x_0=500000 +y_0={10000000 if south else 0} +ellps=WGS84 +units=m +no_defs"
+    )
+    return pyproj.Transformer.from_crs(4326, utm_crs, always_xy=True)
+
 # --- Utility Functions ---
 def get_utm_zone(latitude, longitude):
     """
@@ -38,171 +75,436 @@ def get_utm_zone(latitude, longitude):
     """
     if not (-80.0 <= latitude <= 84.0):
         raise ValueError("Latitude out of UTM range (-80 to 84 degrees).")
-    return math.floor((longitude + 180) / 6) + 1
+    # longitude + 180 is non-negative for valid longitudes, so int() truncation equals floor()
+    zone = int((longitude + 180.0) * (1.0 / 6.0)) + 1
+    if zone > UTM_ZONE_COUNT: # longitude == 180 belongs to the last zone
+        zone = UTM_ZONE_COUNT
+    return zone
+
+def _jit(signature):
+    """
+    Compiles the decorated function with Numba (eagerly, at import time) if
+    available, otherwise returns it unchanged.
+    """
+    if HAS_NUMBA:
+        return njit(signature, cache=True, fastmath=True)
+    return lambda func: func
 
-def format_timestamp_to_kst(utc_timestamp_str):
+@_jit("UniTuple(float64, 3)(float64, float64, float64, float64, float64)")
+def _compute_errors(lat, lon, gt_latitude, gt_longitude, gt_cos_lat):
+    """
+    Returns (hpe, easting_error, northing_error) in meters using an
+    equirectangular projection about the ground truth. Accurate to well below
+    a centimeter for the meter-level offsets being evaluated.
     """
-    Formats a UTC timestamp string (from NMEA or similar) to a KST string.
-    Example input: "010203.000" (HHMMSS.sss)
+    northing_error = math.radians(lat - gt_latitude) * EARTH_MEAN_RADIUS_M
+    easting_error = math.radians(lon - gt_longitude) * EARTH_MEAN_RADIUS_M * gt_cos_lat
+    hpe = math.sqrt(northing_error * northing_error + easting_error * easting_error)
+    return hpe, easting_error, northing_error
+
+# KST has a fixed +09:00 offset (no DST), so ISO timestamps can be shifted arithmetically
+KST_OFFSET_MINUTES = 9 * 60
+KST_FIXED_TZ = timezone(timedelta(minutes=KST_OFFSET_MINUTES))
+_ISO_TIMESTAMP_RE = re.compile(
+    r'^(\d{4}-\d{2}-\d{2})[T ](\d{2}):(\d{2}):(\d{2})(?:\.(\d+))?(Z|[+-]\d{2}:\d{2})?$'
+)
+
+def format_iso_timestamp_to_kst(iso_timestamp_str):
     """
+    Formats an ISO 8601 timestamp string (as sent by the streamer) to a KST string.
+    Example input: "2025-06-01T07:15:58.300000+09:00"
+    Same-day conversions are done with integer arithmetic on the string fields;
+    anything else (day rollover, naive timestamps) goes through datetime.
+    """
+    match = _ISO_TIMESTAMP_RE.match(iso_timestamp_str)
+    if match:
+        date_str, hour, minute, second, fraction, tz = match.groups()
+        if tz is not None:
+            if tz == 'Z':
+                offset_minutes = 0
+            else:
+                offset_minutes = int(tz[1:3]) * 60 + int(tz[4:6])
+                if tz[0] == '-':
+                    offset_minutes = -offset_minutes
+            minutes = int(hour) * 60 + int(minute) + KST_OFFSET_MINUTES - offset_minutes
+            if 0 <= minutes < 24 * 60:
+                millis = (fraction or '')[:3].ljust(3, '0')
+                return '%s %02d:%02d:%s.%s' % (date_str, minutes // 60, minutes % 60, second, millis)
     try:
-        # Assuming the input is just HHMMSS.sss and refers to the current date
-        # This might need adjustment if the timestamp includes date information
-        current_date = datetime.now(timezone.utc).date()
-        hour = int(utc_timestamp_str[0:2])
-        minute = int(utc_timestamp_str[2:4])
-        second = int(utc_timestamp_str[4:6])
-        microsecond = int(float(utc_timestamp_str[6:]) * 1_000_000) if '.' in utc_timestamp_str else 0
-
-        dt_utc = datetime(current_date.year, current_date.month, current_date.day,
-                          hour, minute, second, microsecond, tzinfo=timezone.utc)
-
-        if KST_TZ and KST_TZ != timezone.utc : # Check if KST_TZ is successfully loaded
-            dt_kst = dt_utc.astimezone(KST_TZ)
-            return dt_kst.strftime('%Y-%m-%d %H:%M:%S.%f')[:-3] # Milliseconds
+        dt_kst = datetime.fromisoformat(iso_timestamp_str).astimezone(KST_FIXED_TZ)
+        return dt_kst.strftime('%Y-%m-%d %H:%M:%S.%f')[:-3] # Milliseconds
+    except ValueError as e:
+        console_logger.error(f"[Util] Error formatting timestamp '{iso_timestamp_str}': {e}")
+        return iso_timestamp_str # Return original on error
+
+# Fields GnssEvaluator.evaluate needs, with a pattern matching each as a flat JSON member
+_EXTRACT_FIELDS = tuple(
+    (name, b'"%s"' % name.encode('ascii'),
+     re.compile(rb'"%s"\s*:\s*(?:"([^"\\]*)"|([^,}\s]+))' % name.encode('ascii')))
+    for name in ('timestamp', 'lat', 'lon', 'type')
+)
+
+def _extract_fields(json_bytes):
+    """
+    Extracts only the evaluated fields from a flat JSON object without decoding
+    the whole message. Returns None if the message is not a simple flat object
+    or a value cannot be read, so the caller falls back to the JSON parser.
+    """
+    if json_bytes.count(b'{') != 1 or b'[' in json_bytes:
+        return None
+    data = {}
+    for name, key, pattern in _EXTRACT_FIELDS:
+        match = pattern.search(json_bytes)
+        if match is None:
+            if key in json_bytes:
+                return None # Key present but not in a form we can read
+            continue
+        string_value, token = match.groups()
+        if string_value is not None:
+            data[name] = string_value.decode('utf-8')
+        elif token == b'null':
+            data[name] = None
         else:
-            return dt_utc.strftime('%Y-%m-%d %H:%M:%S.%f')[:-3] + " UTC" # Indicate UTC if KST not available
-    except Exception as e:
-        console_logger.error(f"[Util] Error formatting timestamp '{utc_timestamp_str}': {e}")
-        return utc_timestamp_str # Return original on error
+            try:
+                data[name] = float(token)
+            except ValueError:
+                return None
+    return data
 
-def evaluate_data(json_str, gt_latitude, gt_longitude):
+def _compile_layout_extractor(sample_bytes):
     """
-    Processes a JSON string, extracts GNSS data, and calculates errors.
+    Builds an extractor specialized to the layout of sample_bytes: the fields
+    are read in the order they appear in the sample, each located by the exact
+    key prefix (spacing and opening quote included) it had there, and each
+    search resumes where the previous field ended. Returns None if the sample
+    does not contain every field in a readable form.
     """
-    try:
-        data = json.loads(json_str)
-        if not isinstance(data, dict):
-            console_logger.warning(f"[Evaluate] Parsed JSON is not a dictionary: {json_str}")
+    steps = []
+    for name, _, pattern in _EXTRACT_FIELDS:
+        match = pattern.search(sample_bytes)
+        if match is None:
             return None
+        is_string = match.group(1) is not None
+        if not is_string and match.group(2)[:1] == b'"':
+            return None # String with escapes: only the generic paths can read it
+        value_start = match.start(1 if is_string else 2)
+        steps.append((match.start(), name, sample_bytes[match.start():value_start], is_string))
+    steps = tuple((name, prefix, len(prefix), is_string) for _, name, prefix, is_string in sorted(steps))
+
+    def extract(json_bytes):
+        find = json_bytes.find
+        data = {}
+        pos = 0
+        for name, prefix, prefix_len, is_string in steps:
+            pos = find(prefix, pos)
+            if pos == -1:
+                return None # Layout changed
+            pos += prefix_len
+            if is_string:
+                end = find(b'"', pos)
+                if end == -1 or b'\\' in json_bytes[pos:end]:
+                    return None # Unterminated or escaped string; leave it to the generic paths
+                data[name] = json_bytes[pos:end].decode('utf-8')
+            else:
+                end = find(b',', pos)
+                if end == -1:
+                    end = find(b'}', pos)
+                    if end == -1:
+                        return None
+                data[name] = float(json_bytes[pos:end])
+            pos = end
+        return data
+
+    return extract
+
+# Messages to wait after a failed re-specialization before compiling again, so a
+# stream whose messages cannot be specialized does not recompile on every line
+LAYOUT_RETRY_MESSAGES = 100
+
+class GnssEvaluator:
+    """
+    Evaluates GNSS JSON messages against a fixed ground truth. Everything that
+    depends only on the ground truth is computed once, in the constructor.
+    If precise is set, errors are computed through a UTM projection instead of
+    the local equirectangular approximation.
+    If fast_parse is set, fields are read with an extractor specialized to the
+    layout of previously seen messages before trying the generic paths.
+    """
+    def __init__(self, gt_lat, gt_lon, precise=False, fast_parse=False):
+        self.gt_lat = gt_lat
+        self.gt_lon = gt_lon
+        self.gt_cos_lat = math.cos(math.radians(gt_lat))
+        self.precise = precise
+        self.fast_parse = fast_parse
+
+        # Ground truth (transformer, easting, northing) keyed by (zone, south)
+        self._gt_utm = {}
+        # ((zone, south), (transformer, gt_easting, gt_northing)) of the previous message's zone
+        self._last_utm = None
+        if precise or pyproj is not None:
+            # Project the ground truth once, up front; a receiver near it stays in its zone
+            try:
+                self._last_utm = self._gt_utm_entry(get_utm_zone(gt_lat, gt_lon), gt_lat < 0)
+            except ValueError:
+                if precise:
+                    raise
+
+        # Extractor specialized to the server's message layout (--fast-parse only)
+        self._layout_extractor = None
+        self._layout_retry_countdown = 0
+
+    def _gt_utm_entry(self, utm_zone, south):
+        """
+        Returns the cached ((zone, south), (transformer, gt_easting, gt_northing))
+        entry, projecting the ground truth into the zone on first use.
+        """
+        key = (utm_zone, south)
+        entry = self._gt_utm.get(key)
+        if entry is None:
+            transformer = _get_transformer(utm_zone, south)
+            gt_easting, gt_northing = transformer.transform(self.gt_lon, self.gt_lat)
+            entry = self._gt_utm[key] = (key, (transformer, gt_easting, gt_northing))
+        return entry
+
+    def _utm_errors(self, lat, lon):
+        """
+        Returns (northing_error, easting_error) in meters from a full UTM projection.
+        """
+        key = (get_utm_zone(lat, lon), lat < 0)
+
+        # Fast path: a (near) stationary receiver stays in the zone of the previous message
+        last = self._last_utm
+        if last is None or last[0] != key:
+            last = self._last_utm = self._gt_utm_entry(*key)
+        transformer, gt_easting, gt_northing = last[1]
+        easting, northing = transformer.transform(lon, lat)
+        return northing - gt_northing, easting - gt_easting
+
+    def _fast_extract(self, json_bytes):
+        """
+        Extracts fields with the layout-specialized extractor. On a miss (first
+        message, or the layout changed) returns None and re-specializes on this
+        message, so the caller should fall back to the generic path. If this
+        message cannot be specialized, the current extractor is kept and the next
+        attempt waits LAYOUT_RETRY_MESSAGES misses.
+        """
+        if self._layout_extractor is not None:
+            try:
+                data = self._layout_extractor(json_bytes)
+                if data is not None:
+                    return data
+            except (ValueError, UnicodeDecodeError):
+                pass
+        if self._layout_retry_countdown > 0:
+            self._layout_retry_countdown -= 1
+            return None
+        extractor = _compile_layout_extractor(json_bytes)
+        if extractor is None:
+            self._layout_retry_countdown = LAYOUT_RETRY_MESSAGES
+        else:
+            self._layout_extractor = extractor
+        return None
 
-        msg_time = data.get('timestamp', 'N/A') # Timestamp from message, if available
-        lat = data.get('lat')
-        lon = data.get('lon')
-        fix_type = data.get('type', 'N/A') # e.g., 'GGA_FIX_RTK_FIXED', 'GGA_FIX_INVALID'
-        
-        # if msg_time != 'N/A':
-        #     # If timestamp is in HHMMSS.sss format, convert to KST
-        #     if isinstance(msg_time, str) and len(msg_time) >= 6:
-        #         msg_time = format_timestamp_to_kst(msg_time)
-        #     else:
-        #         msg_time = format_timestamp_to_kst(str(msg_time))
-
-        if lat is None or lon is None:
-            console_logger.warning(f"[Evaluate] Missing lat/lon in data: {json_str}")
+    def evaluate(self, json_bytes):
+        """
+        Processes a JSON message (raw bytes from the socket), extracts GNSS data, and calculates errors.
+        """
+        # Cheap bytes-level prefilter: skip the JSON parse for lines that cannot hold a fix
+        if json_bytes[:1] != b'{' or b'"lat"' not in json_bytes or b'"lon"' not in json_bytes:
+            if console_logger.isEnabledFor(logging.DEBUG):
+                console_logger.debug(f"[Evaluate] Skipping non-fix message: {json_bytes[:50]}")
             return None
 
-        # Convert lat/lon to float
         try:
-            lat = float(lat)
-            lon = float(lon)
-        except ValueError:
-            console_logger.warning(f"[Evaluate] Invalid lat/lon format in data: {json_str}")
+            data = self._fast_extract(json_bytes) if self.fast_parse else None
+            if data is None:
+                data = _extract_fields(json_bytes)
+            if data is None:
+                data = _json.loads(json_bytes)
+            if not isinstance(data, dict):
+                console_logger.warning(f"[Evaluate] Parsed JSON is not a dictionary: {json_bytes}")
+                return None
+
+            msg_time = data.get('timestamp', 'N/A') # Timestamp from message, if available
+            lat = data.get('lat')
+            lon = data.get('lon')
+            fix_type = data.get('type', 'N/A') # e.g., 'GGA_FIX_RTK_FIXED', 'GGA_FIX_INVALID'
+
+            if isinstance(msg_time, str) and msg_time != 'N/A':
+                msg_time = format_iso_timestamp_to_kst(msg_time)
+
+            if lat is None or lon is None:
+                console_logger.warning(f"[Evaluate] Missing lat/lon in data: {json_bytes}")
+                return None
+
+            # JSON numbers already arrive as floats; only convert other types (e.g. strings)
+            try:
+                if type(lat) is not float:
+                    lat = float(lat)
+                if type(lon) is not float:
+                    lon = float(lon)
+            except (ValueError, TypeError):
+                console_logger.warning(f"[Evaluate] Invalid lat/lon format in data: {json_bytes}")
+                return None
+
+            # Calculate errors; far from the ground truth the local approximation degrades,
+            # so those points go through the UTM projection when pyproj is available
+            far_from_gt = (abs(lat - self.gt_lat) > LOCAL_APPROX_MAX_DEG
+                           or abs(lon - self.gt_lon) > LOCAL_APPROX_MAX_DEG)
+            if self.precise or (far_from_gt and pyproj is not None):
+                northing_error, easting_error = self._utm_errors(lat, lon)
+                horizontal_error_2d = math.hypot(northing_error, easting_error) # This is often same as hpe from receiver if fix is good.
+            else:
+                horizontal_error_2d, easting_error, northing_error = _compute_errors(
+                    lat, lon, self.gt_lat, self.gt_lon, self.gt_cos_lat)
+
+            processed_info = {
+                "timestamp": msg_time,
+                "lat": lat,
+                "lon": lon,
+                "fix_type": str(fix_type),
+                "hpe": horizontal_error_2d, # Horizontal Position Error (HPE) in meters
+                "northing_error": northing_error,
+                "easting_error": easting_error,
+            }
+            return processed_info
+
+        except _JSONDecodeError:
+            console_logger.error(f"[Evaluate] Invalid JSON string: {json_bytes}")
+            return None
+        except ValueError as ve: # For errors from get_utm_zone or float conversion
+            console_logger.error(f"[Evaluate] Value error processing data: {ve} for input {json_bytes}")
+            return None
+        except Exception as e:
+            console_logger.error(f"[Evaluate] Unexpected error processing data: {e} for input {json_bytes}", exc_info=True)
             return None
-
-        # Calculate UTM zone and create a PyProj transformer
-        utm_zone = get_utm_zone(lat, lon)
-        transformer = pyproj.Proj(proj='utm', zone=utm_zone, ellps='WGS84', south=lat < 0)
-
-        # Transform current and ground truth coordinates to UTM
-        easting, northing = transformer(lon, lat)
-        gt_easting, gt_northing = transformer(gt_longitude, gt_latitude)
-
-        # Calculate errors
-        northing_error = northing - gt_northing
-        easting_error = easting - gt_easting
-        horizontal_error_2d = math.sqrt(northing_error**2 + easting_error**2) # This is often same as hpe from receiver if fix is good.
-
-        processed_info = {
-            "timestamp": msg_time, #format_timestamp_to_kst(msg_time),
-            "lat": lat,
-            "lon": lon,
-            "fix_type": str(fix_type),
-            "hpe": horizontal_error_2d, # Horizontal Position Error (HPE) in meters
-            "northing_error": northing_error,
-            "easting_error": easting_error,
-        }
-        return processed_info
-
-    except json.JSONDecodeError:
-        console_logger.error(f"[Evaluate] Invalid JSON string: {json_str}")
-        return None
-    except ValueError as ve: # For errors from get_utm_zone or float conversion
-        console_logger.error(f"[Evaluate] Value error processing data: {ve} for input {json_str}")
-        return None
-    except Exception as e:
-        console_logger.error(f"[Evaluate] Unexpected error processing data: {e} for input {json_str}", exc_info=True)
-        return None
 
 # --- Receiver Thread Function ---
+RECV_READER_BUFFER_BYTES = 64 * 1024 # Size of the buffered reader over the socket
+RECV_SOCKET_BUFFER_BYTES = 1 << 20 # Kernel receive buffer (SO_RCVBUF), 1 MiB
+RECV_STOP_CHECK_SECONDS = 0.5 # Longest the receiver waits for data before re-checking stop_event
+
+def _write_raw_batch(raw_lines, msg_rate):
+    """
+    Writes the buffered raw lines, followed by the current message rate, to
+    stdout in a single write and flush.
+    """
+    if msg_rate is not None:
+        raw_lines.append(b"Message rate: %.2f messages/sec\n" % msg_rate)
+    if raw_lines:
+        stdout = sys.stdout.buffer
+        stdout.write(b''.join(raw_lines))
+        stdout.flush()
+        raw_lines.clear()
+
 def receiver_thread_func(
     host,
     port,
-    shared_deque,
-    lock,
-    stop_event
+    shared_queue,
+    stop_event,
+    raw_interval=None
 ):
+    """
+    Receives newline-delimited messages and hands the newest one of each read
+    to the processor through shared_queue.
+    If raw_interval is set, nothing is evaluated: every received line is
+    printed as is, together with the message rate, in one batch per
+    raw_interval seconds.
+    """
     console_logger.info(f"[Receiver] Thread started. Attempting to connect to {host}:{port}.")
-    data_buffer = b""
     sock = None
+    rfile = None
+    selector = None
+    pending = bytearray() # Start of a line whose remainder has not arrived yet
     msg_rate = None
-    msg_prev_time = []
+    last_arrival_time = None
+    ema_interval = None # EMA of the time between messages, in seconds
     alpha = 0.2  # Smoothing factor for EMA
+    raw = raw_interval is not None
+    raw_lines = [] # Raw mode: lines received since the last batch was printed
+    last_raw_write_time = time.monotonic()
 
     try:
         sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, RECV_SOCKET_BUFFER_BYTES)
         sock.connect((host, port))
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
         console_logger.info(f"[Receiver] Successfully connected to server at {host}:{port}.")
-        sock.settimeout(0.1) # Short timeout for non-blocking recv
 
-        while not stop_event.is_set():
+        # Non-blocking socket under a C buffered reader: readline() does the newline
+        # scanning and returns b"" (or a partial line) once the socket runs dry
+        sock.setblocking(False)
+        rfile = sock.makefile('rb', buffering=RECV_READER_BUFFER_BYTES)
+
+        # Sleep in the kernel until data arrives instead of polling recv with a short timeout
+        selector = selectors.DefaultSelector()
+        selector.register(sock, selectors.EVENT_READ)
+
+        # Bind hot-loop callables to locals to skip attribute lookups per iteration
+        select = selector.select
+        readline = rfile.readline
+        monotonic = time.monotonic
+        is_stopping = stop_event.is_set
+
+        while not is_stopping():
+            if raw and monotonic() - last_raw_write_time >= raw_interval:
+                _write_raw_batch(raw_lines, msg_rate)
+                last_raw_write_time = monotonic()
+            if not select(timeout=RECV_STOP_CHECK_SECONDS):
+                continue # No data yet; re-check stop_event
             try:
-                chunk = sock.recv(4096)
-                if not chunk:
-                    console_logger.info("[Receiver] Server closed connection.")
-                    break
-                data_buffer += chunk
-            except socket.timeout:
-                # This is expected if no data is received within the timeout
-                # Check stop_event again to allow quick exit if flagged
-                if stop_event.is_set():
-                    break
-                continue # Go back to recv
+                line = readline()
             except socket.error as e:
                 console_logger.error(f"[Receiver] Socket error: {e}")
                 break 
+            if not line:
+                # Readable but nothing to read: the peer closed the connection
+                console_logger.info("[Receiver] Server closed connection.")
+                break
+
+            # Drain every complete line already received.
+            # Only the newest complete message is kept; the processor never looks at older ones.
+            latest_message = None
+            try:
+                while line:
+                    if line[-1:] != b'\n':
+                        pending += line # Rest of this line comes with a later read
+                        break
+                    if pending:
+                        pending += line
+                        line = bytes(pending)
+                        pending.clear()
+                    message_bytes = line.strip()
+                    if message_bytes:
+                        latest_message = message_bytes
+                        if raw:
+                            raw_lines.append(line)
+                        # Message rate: Exponential Moving Average (EMA) of the inter-arrival time
+                        current_time = monotonic()
+                        if last_arrival_time is not None:
+                            interval = current_time - last_arrival_time
+                            if ema_interval is None:
+                                ema_interval = interval
+                            else:
+                                ema_interval = alpha * interval + (1 - alpha) * ema_interval
+                        last_arrival_time = current_time
+                    if is_stopping():
+                        break
+                    line = readline()
+            except socket.error as e:
+                console_logger.error(f"[Receiver] Socket error: {e}")
+                break
 
-            # Calculate message rate
-            current_time = time.time()
-            msg_prev_time.append(current_time)
-
-            if len(msg_prev_time) > 10: # Keep window of last 10 message arrival times
-                msg_prev_time.pop(0)
-
-            if len(msg_prev_time) >= 2:
-                time_diff = current_time - msg_prev_time[0]
-                if time_diff > 0:
-                    current_rate_calc = len(msg_prev_time) / time_diff
-                    if msg_rate is None:
-                        msg_rate = current_rate_calc
-                    else:
-                        # Exponential Moving Average (EMA)
-                        msg_rate = alpha * current_rate_calc + (1 - alpha) * msg_rate
-
-            # Process messages in buffer
-            while b'\n' in data_buffer:
-                if stop_event.is_set():
-                    break
-                message_bytes, data_buffer = data_buffer.split(b'\n', 1)
+            if latest_message is not None:
+                if ema_interval:
+                    msg_rate = 1.0 / ema_interval
+                if raw:
+                    continue
                 try:
-                    msg_str_decoded = message_bytes.decode('utf-8', errors='replace').strip()
-                    if msg_str_decoded:
-                        with lock:
-                            shared_deque.append((msg_str_decoded, msg_rate))
-                except UnicodeDecodeError as ude:
-                    console_logger.warning(f"[Receiver] Unicode decode error: {ude}. Message part: {message_bytes[:50]}")
-                except Exception as e_decode:
-                    console_logger.error(f"[Receiver] Error decoding/queueing message: {e_decode}")
+                    # Raw bytes go straight to the JSON parser; no decode step needed
+                    shared_queue.put((latest_message, msg_rate))
+                except Exception as e_queue:
+                    console_logger.error(f"[Receiver] Error queueing message: {e_queue}")
 
 
     except ConnectionRefusedError:
@@ -213,6 +515,12 @@ def receiver_thread_func(
         console_logger.error(f"[Receiver] Unexpected error: {e}", exc_info=True)
     finally:
         console_logger.info("[Receiver] Thread stopping...")
+        if raw:
+            _write_raw_batch(raw_lines, None)
+        if selector:
+            selector.close()
+        if rfile:
+            rfile.close()
         if sock:
             try:
                 sock.shutdown(socket.SHUT_RDWR) # Gracefully close
@@ -225,105 +533,207 @@ def receiver_thread_func(
 
 
 # --- Processor Thread Function ---
+# Report formats are built once; GnssEvaluator.evaluate always fills every numeric field.
+# Each comes in a variant with the message rate as a float and one with it as "N/A"
+# (no rate measured yet), so a report is always a single % pass with no None checks.
+# CSV rows are built directly as bytes: the fields never need quoting
+CSV_HEADER = b"TimestampKST,Latitude,Longitude,FixType,HPE(m),NorthingError(m),EastingError(m),MessageRate(Hz)\n"
+CSV_ROW_FMT, CSV_ROW_NO_RATE_FMT = (
+    b"%s,%.6f,%.6f,%s,%.2f,%.2f,%.2f," + rate + b"\n" for rate in (b"%.2f", b"N/A")
+)
+CSV_NO_DATA_FMT, CSV_NO_DATA_NO_RATE_FMT = (
+    b"N/A,N/A,N/A,N/A,N/A,N/A,N/A," + rate + b"\n" for rate in (b"%.2f", b"N/A")
+)
+CONSOLE_REPORT_FMT, CONSOLE_REPORT_NO_RATE_FMT = (
+    "CONSOLE_REPORT | TS_KST:%s | Lat:%.6f | Lon:%.6f | Type:%s | HPE:%.2fm | "
+    "N_Err:%.2fm | E_Err:%.2fm | MsgRate:" + rate + "msg/s (Report @ %sHz)" for rate in ("%.2f", "N/A")
+)
+CONSOLE_NO_DATA_FMT, CONSOLE_NO_DATA_NO_RATE_FMT = (
+    "CONSOLE_REPORT | MsgRate:" + rate + "msg/s | (No valid GNSS data for this interval) (Report @ %sHz)"
+    for rate in ("%.2f", "N/A")
+)
+LOG_FILE_BUFFER_BYTES = 64 * 1024
+LOG_FLUSH_INTERVAL_SECONDS = 1.0 # Upper bound on how stale the log file can be on disk
+LOG_FLUSH_EVERY_LINES = 100 # Also flush after this many rows at high eval_hz
+REPORT_QUEUE_MAXSIZE = 256 # Reports buffered for the writer thread before the oldest is dropped
+
+def _put_report(report_queue, item):
+    """
+    Queues an item for the writer thread without blocking, dropping the oldest
+    queued report if the writer has fallen behind. Returns False if one was dropped.
+    """
+    try:
+        report_queue.put_nowait(item)
+        return True
+    except queue.Full:
+        try:
+            report_queue.get_nowait()
+        except queue.Empty:
+            pass
+        report_queue.put_nowait(item) # Single producer, so there is room now
+        return False
+
+# --- Report Writer Thread Function ---
+def report_writer_thread_func(
+    report_queue,
+    log_file_handle,
+    log_file_path
+):
+    """
+    Performs all console and log file output on behalf of the processor so a
+    slow terminal or disk never delays evaluation. Exits on a None sentinel.
+    """
+    console_logger.info("[Writer] Thread started.")
+    last_flush_time = time.monotonic()
+    unflushed_lines = 0
+
+    while True:
+        item = report_queue.get()
+        if item is None:
+            break
+        console_fmt, console_args, report_line = item
+        if console_fmt is not None:
+            console_logger.info(console_fmt, *console_args)
+
+        if log_file_handle and report_line is not None:
+            try:
+                log_file_handle.write(report_line)
+                unflushed_lines += 1
+                # Flush on a wall-clock or line-count cadence rather than on every report
+                now = time.monotonic()
+                if (unflushed_lines >= LOG_FLUSH_EVERY_LINES
+                        or now - last_flush_time >= LOG_FLUSH_INTERVAL_SECONDS):
+                    log_file_handle.flush()
+                    last_flush_time = now
+                    unflushed_lines = 0
+            except Exception as e_log_file:
+                console_logger.error(f"[Writer] Error writing to log file: {e_log_file}")
+                # Consider closing the file or re-opening if errors persist
+
+    if log_file_handle:
+        try:
+            # fsync only once, on shutdown, so the completed log survives a power loss
+            log_file_handle.flush()
+            os.fsync(log_file_handle.fileno())
+            log_file_handle.close()
+            console_logger.info(f"[Writer] Closed log file: {log_file_path}")
+        except Exception as e_close:
+            console_logger.error(f"[Writer] Error closing log file: {e_close}")
+    console_logger.info("[Writer] Thread finished.")
+
 def processor_thread_func(
-    shared_deque,
-    lock,
+    shared_queue,
     eval_hz,
     gt_lat,
     gt_lon,
+    precise,
+    fast_parse,
     log_enable_flag,
     log_file_path,
     stop_event
 ):
     console_logger.info("[Processor] Thread started.")
+    evaluator = GnssEvaluator(gt_lat, gt_lon, precise, fast_parse) # Ground truth is fixed for the whole run
 
     log_file_handle = None
     if log_enable_flag and log_file_path:
         try:
             Path(log_file_path).parent.mkdir(parents=True, exist_ok=True)
-            log_file_handle = open(log_file_path, 'w', encoding='utf-8', newline='')
+            log_file_handle = open(log_file_path, 'wb', buffering=LOG_FILE_BUFFER_BYTES)
             # Write header to log file
-            header = "TimestampKST,Latitude,Longitude,FixType,HPE(m),NorthingError(m),EastingError(m),MessageRate(Hz)\n"
-            log_file_handle.write(header)
+            log_file_handle.write(CSV_HEADER)
             log_file_handle.flush() # Ensure header is written
             console_logger.info(f"[Processor] Logging report data lines to '{log_file_path}' enabled.")
         except IOError as e:
             console_logger.error(f"[Processor] Failed to open log file {log_file_path}: {e}")
             log_file_handle = None # Ensure it's None if open fails
+    write_rows = log_file_handle is not None
 
-    report_interval_seconds = 1.0 / eval_hz if eval_hz > 0 else float('inf') # Avoid division by zero
-    if report_interval_seconds == float('inf'):
-        console_logger.warning("[Processor] eval_hz is zero or invalid, processor will not report periodically.")
+    # All output happens on the writer thread, which owns (and closes) the log file
+    report_queue = queue.Queue(maxsize=REPORT_QUEUE_MAXSIZE)
+    writer = threading.Thread(target=report_writer_thread_func,
+                              args=(report_queue, log_file_handle, log_file_path),
+                              name="ReportWriterThread", daemon=True)
+    writer.start()
 
+    periodic = eval_hz > 0
+    report_interval_seconds = 1.0 / eval_hz if periodic else float('inf') # Avoid division by zero
+    if not periodic:
+        console_logger.warning("[Processor] eval_hz is zero or invalid, processor will report each message as it arrives.")
+
+    # Reports are scheduled on a fixed monotonic cadence, so processing time does not add drift
+    monotonic = time.monotonic
+    next_deadline = monotonic() + report_interval_seconds
 
     while not stop_event.is_set():
-        # Wait for the report interval or until stop_event is set
-        if report_interval_seconds != float('inf') and stop_event.wait(report_interval_seconds):
-            break # Stop event was set
+        data = None
+        if periodic:
+            # Wait for the next report deadline or until stop_event is set
+            timeout = next_deadline - monotonic()
+            if timeout > 0 and stop_event.wait(timeout):
+                break # Stop event was set
+            next_deadline += report_interval_seconds
+            now = monotonic()
+            if next_deadline <= now: # Fell behind by a whole interval; skip the missed ticks
+                next_deadline = now + report_interval_seconds
+        else:
+            # No reporting rate: report each message as it arrives instead of spinning
+            try:
+                data = shared_queue.get(timeout=RECV_STOP_CHECK_SECONDS)
+            except queue.Empty:
+                continue
 
-        msg_str_from_q = None
+        msg_bytes_from_q = None
         msg_rate_from_q = None
         processed_info = None
 
-        with lock:
-            if shared_deque:
-                data = shared_deque.popleft()
-                msg_str_from_q = data[0]
-                msg_rate_from_q = data[1]
-
-        if msg_str_from_q: # Check if a message was actually popped
-            processed_info = evaluate_data(msg_str_from_q, gt_lat, gt_lon)
-
-
-        # --- Constructing report string and data fields ---
-        report_data_fields_list = []
-        console_report_str_parts = []
-
-        if processed_info:
-            ts_kst = processed_info.get('timestamp', "N/A")
-            lat_str = f"{processed_info.get('lat', 0.0):.6f}" if processed_info.get('lat') is not None else "N/A"
-            lon_str = f"{processed_info.get('lon', 0.0):.6f}" if processed_info.get('lon') is not None else "N/A"
-            fix_type = str(processed_info.get('fix_type', "N/A"))
-            hpe_str = f"{processed_info.get('hpe', 99.99):.2f}" if processed_info.get('hpe') is not None else "N/A"
-            n_err_str = f"{processed_info.get('northing_error', 0.0):.2f}" if processed_info.get('northing_error') is not None else "N/A"
-            e_err_str = f"{processed_info.get('easting_error', 0.0):.2f}" if processed_info.get('easting_error') is not None else "N/A"
-
-            report_data_fields_list = [
-                ts_kst, lat_str, lon_str, fix_type, hpe_str, n_err_str, e_err_str,
-                f"{msg_rate_from_q:.2f}" if msg_rate_from_q is not None else "N/A"
-            ]
-            console_report_str_parts = [
-                f"TS_KST:{ts_kst}", f"Lat:{lat_str}", f"Lon:{lon_str}", f"Type:{fix_type}",
-                f"HPE:{hpe_str}m", f"N_Err:{n_err_str}m", f"E_Err:{e_err_str}m",
-                f"MsgRate:{f'{msg_rate_from_q:.2f}' if msg_rate_from_q is not None else 'N/A'}msg/s"
-            ]
-        else: # No valid processed_info (either no message from queue, or evaluate_data returned None)
-            current_rate_str = f"{msg_rate_from_q:.2f}" if msg_rate_from_q is not None else "N/A"
-            report_data_fields_list = ["N/A"] * 7 + [current_rate_str] # 7 N/A fields + rate
-            console_report_str_parts = [f"MsgRate:{current_rate_str}msg/s", "(No valid GNSS data for this interval)"]
-
-
-        console_logger.info(f"CONSOLE_REPORT | {' | '.join(console_report_str_parts)} (Report @ {eval_hz}Hz)")
-
-        if log_file_handle:
+        # Drain everything queued since the last report; only the newest message is evaluated
+        while True:
             try:
-                log_file_handle.write(','.join(map(str, report_data_fields_list)) + "\n")
-                log_file_handle.flush() # Ensure data is written to disk periodically
-            except Exception as e_log_file:
-                console_logger.error(f"[Processor] Error writing to log file: {e_log_file}")
-                # Consider closing the file or re-opening if errors persist
-
-        if report_interval_seconds == float('inf') and stop_event.is_set(): # If eval_hz was 0, we need another way to break
-            break
+                data = shared_queue.get_nowait()
+            except queue.Empty:
+                break
+        if data is not None:
+            msg_bytes_from_q, msg_rate_from_q = data
+
+        if msg_bytes_from_q: # Check if a message was actually popped
+            processed_info = evaluator.evaluate(msg_bytes_from_q)
+
+
+        # --- Constructing report lines from the precompiled formats ---
+        has_rate = msg_rate_from_q is not None
+        rate_args = (msg_rate_from_q,) if has_rate else ()
+        report_line = None
+        console_item = (None, None) # Stays empty when INFO is filtered out
+        console_enabled = console_logger.isEnabledFor(logging.INFO)
+        if processed_info:
+            ts_kst = str(processed_info['timestamp'])
+            fix_type = processed_info['fix_type']
+            values = (processed_info['lat'], processed_info['lon'], fix_type, processed_info['hpe'],
+                      processed_info['northing_error'], processed_info['easting_error'])
+            if console_enabled:
+                console_item = (CONSOLE_REPORT_FMT if has_rate else CONSOLE_REPORT_NO_RATE_FMT,
+                                (ts_kst,) + values + rate_args + (eval_hz,))
+            if write_rows:
+                report_line = (CSV_ROW_FMT if has_rate else CSV_ROW_NO_RATE_FMT) % (
+                    (ts_kst.encode('utf-8'),) + values[:2] + (fix_type.encode('utf-8'),) + values[3:] + rate_args
+                )
+        else: # No valid processed_info (either no message from queue, or the evaluator returned None)
+            if console_enabled:
+                console_item = (CONSOLE_NO_DATA_FMT if has_rate else CONSOLE_NO_DATA_NO_RATE_FMT,
+                                rate_args + (eval_hz,))
+            if write_rows:
+                report_line = (CSV_NO_DATA_FMT if has_rate else CSV_NO_DATA_NO_RATE_FMT) % rate_args
+
+        if not _put_report(report_queue, console_item + (report_line,)):
+            console_logger.warning("[Processor] Report writer is falling behind; dropped the oldest queued report.")
 
 
     console_logger.info("[Processor] Stop event received or loop finished.")
-    if log_file_handle:
-        try:
-            log_file_handle.close()
-            console_logger.info(f"[Processor] Closed log file: {log_file_path}")
-        except Exception as e_close:
-            console_logger.error(f"[Processor] Error closing log file: {e_close}")
+    _put_report(report_queue, None) # Sentinel: writer drains what is queued, then closes the log file
+    writer.join(timeout=4.0)
+    if writer.is_alive():
+        console_logger.warning("[Processor] Report writer thread did not join in time.")
     console_logger.info("[Processor] Thread finished.")
 
 # --- Argument Parser Setup ---
@@ -344,6 +754,12 @@ def parse_args():
     pgroup_eval.add_argument('--eval-hz', type=float, help='Processor thread reporting rate in Hz (overrides YAML/default)')
     pgroup_eval.add_argument('--gt-lat', type=float, help='Ground truth latitude (overrides YAML/default)')
     pgroup_eval.add_argument('--gt-lon', type=float, help='Ground truth longitude (overrides YAML/default)')
+    pgroup_eval.add_argument('--precise', action=argparse.BooleanOptionalAction, default=None,
+                        help='Compute errors through a full UTM projection (pyproj) instead of the local approximation. Overrides YAML if present.')
+    pgroup_eval.add_argument('--fast-parse', action=argparse.BooleanOptionalAction, default=None,
+                        help='Parse messages with an extractor specialized to the server message layout. Overrides YAML if present.')
+    pgroup_eval.add_argument('--raw', action='store_true',
+                        help='Skip evaluation; print every received line and the message rate once per report interval.')
 
     # Logging settings
     pgroup_log = parser.add_argument_group('Logging Configuration')
@@ -364,6 +780,8 @@ def main():
         'eval_hz': 1.0,
         'gt_lat': 36.116588, # Example: Gumi City Hall
         'gt_lon': 128.364695, # Example: Gumi City Hall
+        'precise': False,
+        'fast_parse': False,
         'log_enable': False,
         'log_file': None, # Default to None, will be auto-generated if enabled and not specified
     }
@@ -373,7 +791,7 @@ def main():
     if args.yaml_config:
         try:
             with open(args.yaml_config, 'r', encoding='utf-8') as f:
-                yaml_data = yaml.safe_load(f)
+                yaml_data = yaml.load(f, Loader=YamlLoader)
                 if yaml_data:
                     console_logger.info(f"[Main] Loading configuration from YAML file: {args.yaml_config}")
                     # TCP settings
@@ -383,6 +801,8 @@ def main():
                     # Evaluation settings
                     eval_settings = yaml_data.get('evaluation', {})
                     if eval_settings.get('rate_hz') is not None: config['eval_hz'] = eval_settings['rate_hz']
+                    if eval_settings.get('precise') is not None: config['precise'] = eval_settings['precise']
+                    if eval_settings.get('fast_parse') is not None: config['fast_parse'] = eval_settings['fast_parse']
                     # Ground truth settings
                     gt_settings = yaml_data.get('ground_truth', {})
                     if gt_settings.get('latitude') is not None: config['gt_lat'] = gt_settings['latitude']
@@ -409,6 +829,8 @@ def main():
     if cli_args_provided.get('eval_hz') is not None: config['eval_hz'] = cli_args_provided['eval_hz']
     if cli_args_provided.get('gt_lat') is not None: config['gt_lat'] = cli_args_provided['gt_lat']
     if cli_args_provided.get('gt_lon') is not None: config['gt_lon'] = cli_args_provided['gt_lon']
+    if args.precise is not None: config['precise'] = args.precise
+    if args.fast_parse is not None: config['fast_parse'] = args.fast_parse
     # Handle log_enable (BooleanOptionalAction means args.log_enable can be True, False, or None)
     if args.log_enable is not None: # If --log-enable or --no-log-enable was used
         config['log_enable'] = args.log_enable
@@ -448,43 +870,60 @@ def main():
         f"  Report Rate: {config['eval_hz']} Hz\n"
         f"  GT Latitude: {config['gt_lat']}\n"
         f"  GT Longitude: {config['gt_lon']}\n"
+        f"  Precise (UTM) Errors: {config['precise']}\n"
+        f"  Fast Parse: {config['fast_parse']}\n"
+        f"  Raw Mode: {args.raw}\n"
         f"  Logging Enabled: {final_log_enable_flag}\n"
         f"  Log File Path: {final_log_file_path if final_log_enable_flag else 'N/A'}"
     )
 
+    if config['precise'] and pyproj is None:
+        console_logger.error("[Main] --precise requires pyproj, which is not installed. Falling back to the local error approximation.")
+        config['precise'] = False
+
     if config['eval_hz'] <= 0:
-        console_logger.warning("[Main] eval_hz is non-positive. Processor thread will process messages as they arrive but console/log reporting interval will be effectively infinite (or very slow based on wait timeout).")
+        console_logger.warning("[Main] eval_hz is non-positive. Processor thread will report each message as it arrives instead of at a fixed rate.")
 
 
     # --- Shared Resources & Threads ---
-    shared_message_deque = deque(maxlen=200) # Max length to prevent unbounded memory growth if processor is slow
-    deque_lock = threading.Lock()
+    shared_message_queue = queue.SimpleQueue() # Drained every report; only the newest message is evaluated
     stop_event = threading.Event()
 
+    # Raw mode prints what the receiver gets at the report interval and runs no processor
+    raw_interval = None
+    if args.raw:
+        raw_interval = 1.0 / config['eval_hz'] if config['eval_hz'] > 0 else 1.0
+
     receiver = threading.Thread(target=receiver_thread_func,
                                 args=(config['tcp_host'], config['tcp_port'],
-                                      shared_message_deque, deque_lock,
-                                      stop_event),
+                                      shared_message_queue,
+                                      stop_event, raw_interval),
                                 name="ReceiverThread")
-    processor = threading.Thread(target=processor_thread_func,
-                                 args=(shared_message_deque, deque_lock,
-                                       config['eval_hz'], config['gt_lat'], config['gt_lon'],
-                                       final_log_enable_flag, final_log_file_path,
-                                       stop_event),
-                                 name="ProcessorThread")
+    processor = None
+    if not args.raw:
+        processor = threading.Thread(target=processor_thread_func,
+                                     args=(shared_message_queue,
+                                           config['eval_hz'], config['gt_lat'], config['gt_lon'],
+                                           config['precise'], config['fast_parse'],
+                                           final_log_enable_flag, final_log_file_path,
+                                           stop_event),
+                                     name="ProcessorThread")
 
     # Daemon threads will exit when the main program exits
     receiver.daemon = True
-    processor.daemon = True
+    if processor:
+        processor.daemon = True
 
     console_logger.info("[Main] Starting threads...")
     receiver.start()
-    processor.start()
+    if processor:
+        processor.start()
 
     try:
         # Keep main thread alive while worker threads are running
         # Or implement more sophisticated monitoring/control logic
-        while not stop_event.is_set() and receiver.is_alive() and processor.is_alive():
+        while (not stop_event.is_set() and receiver.is_alive()
+               and (processor is None or processor.is_alive())):
             time.sleep(1.0) # Check periodically
 
         # If stop_event was set by one of the threads (e.g., receiver connection closed)
@@ -493,7 +932,7 @@ def main():
         elif not receiver.is_alive():
             console_logger.warning("[Main] Receiver thread exited unexpectedly. Signaling stop.")
             if not stop_event.is_set(): stop_event.set()
-        elif not processor.is_alive():
+        elif processor and not processor.is_alive():
             console_logger.warning("[Main] Processor thread exited unexpectedly. Signaling stop.")
             if not stop_event.is_set(): stop_event.set()
 
@@ -517,10 +956,11 @@ def main():
         if receiver.is_alive():
             console_logger.warning("[Main] Receiver thread did not join in time.")
 
-        console_logger.info("[Main] Waiting for Processor thread to join (timeout 5s)...")
-        processor.join(timeout=5.0) # Processor might be writing to file
-        if processor.is_alive():
-            console_logger.warning("[Main] Processor thread did not join in time.")
+        if processor:
+            console_logger.info("[Main] Waiting for Processor thread to join (timeout 5s)...")
+            processor.join(timeout=5.0) # Processor might be writing to file
+            if processor.is_alive():
+                console_logger.warning("[Main] Processor thread did not join in time.")
 
         console_logger.info("[Main] Application finished.")
 
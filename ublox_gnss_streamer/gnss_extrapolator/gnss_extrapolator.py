@@ -1,7 +1,6 @@
+import math
 import time
 import numpy as np
-from collections import deque
-from pyproj import CRS, Transformer
 from ublox_gnss_streamer.utils.logger import logger
 
 # Only import GeoidHeight if needed (pyproj >= 3.6.0)
@@ -11,6 +10,101 @@ try:
 except ImportError:
     HAS_GEOID = False
 
+# Numba is optional: the geodesy kernels below are compiled when it is installed
+try:
+    from numba import njit
+    HAS_NUMBA = True
+except ImportError:
+    HAS_NUMBA = False
+
+# WGS84 ellipsoid
+WGS84_A = 6378137.0                      # Semi-major axis (m)
+WGS84_E2 = 6.69437999014e-3              # First eccentricity squared
+WGS84_B = WGS84_A * math.sqrt(1 - WGS84_E2)  # Semi-minor axis (m)
+WGS84_EP2 = (WGS84_A**2 - WGS84_B**2) / WGS84_B**2  # Second eccentricity squared
+
+# Points within this (|dlat| + |dlon|, degrees; about 1 km) of the last geoid query share its
+# undulation, so across vehicle-scale motion hMSL is a constant offset from the ellipsoid height
+GEOID_CACHE_TOLERANCE_DEG = 1e-2
+
+# Below this lead time (s) the extrapolated point equals the last fix (1e-4 s is ~1 mm at 10 m/s)
+EXTRAPOLATE_MIN_DT = 1e-4
+
+def _lla_to_ecef(lat, lon, height):
+    """Geodetic (deg, deg, m ellipsoid) to ECEF (m), closed form."""
+    phi = math.radians(lat)
+    lam = math.radians(lon)
+    sin_phi = math.sin(phi)
+    cos_phi = math.cos(phi)
+    n = WGS84_A / math.sqrt(1 - WGS84_E2 * sin_phi * sin_phi)
+    x = (n + height) * cos_phi * math.cos(lam)
+    y = (n + height) * cos_phi * math.sin(lam)
+    z = (n * (1 - WGS84_E2) + height) * sin_phi
+    return x, y, z
+
+def _ecef_to_lla(x, y, z):
+    """ECEF (m) to geodetic (deg, deg, m ellipsoid), using Heikkinen's closed form."""
+    a, b, e2 = WGS84_A, WGS84_B, WGS84_E2
+    p2 = x * x + y * y
+    p = math.sqrt(p2)
+    z2 = z * z
+    f = 54 * b * b * z2
+    g = p2 + (1 - e2) * z2 - e2 * (a * a - b * b)
+    c = e2 * e2 * f * p2 / (g * g * g)
+    s = (1 + c + math.sqrt(c * c + 2 * c)) ** (1.0 / 3.0)
+    k = s + 1 + 1 / s
+    pp = f / (3 * k * k * g * g)
+    q = math.sqrt(1 + 2 * e2 * e2 * pp)
+    r0 = (-(pp * e2 * p) / (1 + q)
+          + math.sqrt(0.5 * a * a * (1 + 1 / q) - pp * (1 - e2) * z2 / (q * (1 + q)) - 0.5 * pp * p2))
+    t = p - e2 * r0
+    u = math.sqrt(t * t + z2)
+    v = math.sqrt(t * t + (1 - e2) * z2)
+    z0 = b * b * z / (a * v)
+    height = u * (1 - b * b / (a * v))
+    lat = math.degrees(math.atan2(z + WGS84_EP2 * z0, p))
+    lon = math.degrees(math.atan2(y, x))
+    return lat, lon, height
+
+def _extrapolate_core(x, y, z, vx, vy, vz, dt):
+    """Moves an ECEF position by an ECEF velocity over dt seconds and returns its lat/lon/height."""
+    return _ecef_to_lla(x + vx * dt, y + vy * dt, z + vz * dt)
+
+if HAS_NUMBA:
+    # Explicit signatures compile at import rather than on the first fix, which would
+    # otherwise stall the extrapolator thread for the JIT time; cache=True keeps the
+    # machine code on disk so later starts skip the compile as well
+    _lla_to_ecef = njit("UniTuple(float64, 3)(float64, float64, float64)",
+                        cache=True, fastmath=True)(_lla_to_ecef)
+    _ecef_to_lla = njit("UniTuple(float64, 3)(float64, float64, float64)",
+                        cache=True, fastmath=True)(_ecef_to_lla)
+    _extrapolate_core = njit("UniTuple(float64, 3)(float64, float64, float64, float64, float64, float64, float64)",
+                             cache=True, fastmath=True)(_extrapolate_core)
+
+def _ecef_to_lla_array(x, y, z):
+    """Vectorized _ecef_to_lla over NumPy arrays of ECEF coordinates."""
+    a, b, e2 = WGS84_A, WGS84_B, WGS84_E2
+    p2 = x * x + y * y
+    p = np.sqrt(p2)
+    z2 = z * z
+    f = 54 * b * b * z2
+    g = p2 + (1 - e2) * z2 - e2 * (a * a - b * b)
+    c = e2 * e2 * f * p2 / (g * g * g)
+    s = np.cbrt(1 + c + np.sqrt(c * c + 2 * c))
+    k = s + 1 + 1 / s
+    pp = f / (3 * k * k * g * g)
+    q = np.sqrt(1 + 2 * e2 * e2 * pp)
+    r0 = (-(pp * e2 * p) / (1 + q)
+          + np.sqrt(0.5 * a * a * (1 + 1 / q) - pp * (1 - e2) * z2 / (q * (1 + q)) - 0.5 * pp * p2))
+    t = p - e2 * r0
+    u = np.sqrt(t * t + z2)
+    v = np.sqrt(t * t + (1 - e2) * z2)
+    z0 = b * b * z / (a * v)
+    height = u * (1 - b * b / (a * v))
+    lat = np.degrees(np.arctan2(z + WGS84_EP2 * z0, p))
+    lon = np.degrees(np.arctan2(y, x))
+    return lat, lon, height
+
 class GnssExtrapolator:
     """
     GNSS extrapolator using local ENU projection for high accuracy.
@@ -22,20 +116,24 @@ class GnssExtrapolator:
         """
         hmsl_mode: 'geoid' (default, best) or 'offset' (fast, local)
         geoid_model: e.g., 'egm96-5', 'egm96-15', 'egm2008-1', etc.
+        max_buffer is kept for compatibility; only the last two fixes are ever used.
         """
         self.ref_lat = None
         self.ref_lon = None
         self.ref_height = None
-        self.ref_ecef = None
-        self.buffer = deque(maxlen=max_buffer)
+        # Reference point in ECEF, as plain floats
+        self._ref_x = self._ref_y = self._ref_z = None
+        # Trig of the reference point for the ECEF<->ENU rotations, computed once in add_fix
+        self._sin_phi = self._cos_phi = None
+        self._sin_lam = self._cos_lam = None
+        # The two most recent fixes
+        self._last = None
+        self._prev = None
+        # Flat (last_fix, x, y, z, vx, vy, vz) record of the newest fix in ECEF,
+        # rebuilt once per fix so extrapolation never reads the fix dicts
+        self._motion_record = None
         self.transformers_initialized = False
 
-        # Set up pyproj transformers (do not depend on ref point)
-        self.crs_wgs84 = CRS.from_epsg(4979)  # WGS84 3D
-        self.crs_ecef = CRS.from_epsg(4978)   # ECEF
-        self.transformer_lla_to_ecef = Transformer.from_crs(self.crs_wgs84, self.crs_ecef, always_xy=True)
-        self.transformer_ecef_to_lla = Transformer.from_crs(self.crs_ecef, self.crs_wgs84, always_xy=True)
-
         # hMSL calculation mode
         self.hmsl_mode = hmsl_mode
         self.geoid_offset = None
@@ -44,49 +142,62 @@ class GnssExtrapolator:
             self.geoid = GeoidHeight(geoid_model)
         else:
             self.geoid = None
+        # Last evaluated (lat, lon, undulation), seeded at the reference point; the geoid is
+        # smooth, so nearby points reuse it
+        self._geoid_cache = (None, None, None)
 
     def lla_to_ecef(self, lat, lon, height):
-        x, y, z = self.transformer_lla_to_ecef.transform(lon, lat, height)
-        return np.array([x, y, z])
+        return np.array(_lla_to_ecef(lat, lon, height))
 
     def ecef_to_lla(self, x, y, z):
-        lon, lat, height = self.transformer_ecef_to_lla.transform(x, y, z)
-        return lat, lon, height
+        return _ecef_to_lla(x, y, z)
 
     def lla_to_enu(self, lat, lon, height):
-        if self.ref_ecef is None:
+        if self._ref_x is None:
             raise ValueError("Reference ECEF not set.")
-        xyz = self.lla_to_ecef(lat, lon, height)
-        dx = xyz - self.ref_ecef
-        phi = np.radians(self.ref_lat)
-        lam = np.radians(self.ref_lon)
-        t = np.array([
-            [-np.sin(lam),              np.cos(lam),             0],
-            [-np.sin(phi)*np.cos(lam), -np.sin(phi)*np.sin(lam), np.cos(phi)],
-            [np.cos(phi)*np.cos(lam),  np.cos(phi)*np.sin(lam),  np.sin(phi)]
-        ])
-        enu = t @ dx
-        return enu  # [e, n, u]
+        x, y, z = _lla_to_ecef(lat, lon, height)
+        return self._ecef_to_enu_delta(x - self._ref_x, y - self._ref_y, z - self._ref_z)  # (e, n, u)
 
     def enu_to_lla(self, e, n, u):
-        if self.ref_ecef is None:
+        if self._ref_x is None:
             raise ValueError("Reference ECEF not set.")
-        phi = np.radians(self.ref_lat)
-        lam = np.radians(self.ref_lon)
-        t = np.array([
-            [-np.sin(lam), -np.sin(phi)*np.cos(lam),  np.cos(phi)*np.cos(lam)],
-            [ np.cos(lam), -np.sin(phi)*np.sin(lam),  np.cos(phi)*np.sin(lam)],
-            [          0,              np.cos(phi),              np.sin(phi)]
-        ])
-        dx = t @ np.array([e, n, u])
-        xyz = self.ref_ecef + dx
-        lat, lon, height = self.ecef_to_lla(*xyz)
+        dx, dy, dz = self._enu_to_ecef_delta(e, n, u)
+        lat, lon, height = _ecef_to_lla(self._ref_x + dx, self._ref_y + dy, self._ref_z + dz)
         return lat, lon, height
 
+    def _set_rotation(self, ref_lat, ref_lon):
+        """Cache sin/cos of the reference point used by the ECEF<->ENU rotations."""
+        phi = math.radians(ref_lat)
+        lam = math.radians(ref_lon)
+        self._sin_phi, self._cos_phi = math.sin(phi), math.cos(phi)
+        self._sin_lam, self._cos_lam = math.sin(lam), math.cos(lam)
+
+    def _ecef_to_enu_delta(self, dx, dy, dz):
+        """Rotate an ECEF vector into the local ENU frame (written out; no matrix allocation)."""
+        sin_phi, cos_phi = self._sin_phi, self._cos_phi
+        sin_lam, cos_lam = self._sin_lam, self._cos_lam
+        e = -sin_lam*dx + cos_lam*dy
+        n = -sin_phi*cos_lam*dx - sin_phi*sin_lam*dy + cos_phi*dz
+        u = cos_phi*cos_lam*dx + cos_phi*sin_lam*dy + sin_phi*dz
+        return e, n, u
+
+    def _enu_to_ecef_delta(self, e, n, u):
+        """Rotate a local ENU vector into ECEF (written out; no matrix allocation)."""
+        sin_phi, cos_phi = self._sin_phi, self._cos_phi
+        sin_lam, cos_lam = self._sin_lam, self._cos_lam
+        dx = -sin_lam*e - sin_phi*cos_lam*n + cos_phi*cos_lam*u
+        dy = cos_lam*e - sin_phi*sin_lam*n + cos_phi*sin_lam*u
+        dz = cos_phi*n + sin_phi*u
+        return dx, dy, dz
+
     def ellipsoid_to_hmsl(self, lat, lon, height):
         """Convert ellipsoid height to mean sea level (hMSL)."""
         if self.hmsl_mode == 'geoid' and self.geoid is not None:
-            undulation = self.geoid.height(lon, lat)
+            cached_lat, cached_lon, undulation = self._geoid_cache
+            if (cached_lat is None
+                    or abs(lat - cached_lat) + abs(lon - cached_lon) >= GEOID_CACHE_TOLERANCE_DEG):
+                undulation = self.geoid.height(lon, lat)
+                self._geoid_cache = (lat, lon, undulation)
             hmsl = height - undulation
             return hmsl
         elif self.hmsl_mode == 'offset' and self.geoid_offset is not None:
@@ -104,23 +215,29 @@ class GnssExtrapolator:
             self.ref_lat = gnss_fix['lat']
             self.ref_lon = gnss_fix['lon']
             self.ref_height = gnss_fix.get('height', 0)
-            self.ref_ecef = self.lla_to_ecef(self.ref_lat, self.ref_lon, self.ref_height)
+            rx, ry, rz = _lla_to_ecef(self.ref_lat, self.ref_lon, self.ref_height)
+            self._ref_x, self._ref_y, self._ref_z = float(rx), float(ry), float(rz)
+            self._set_rotation(self.ref_lat, self.ref_lon)
+            if self.geoid is not None:
+                self._geoid_cache = (self.ref_lat, self.ref_lon, self.geoid.height(self.ref_lon, self.ref_lat))
             self.transformers_initialized = True
         # Update geoid offset if both values are present and using offset mode
         if self.hmsl_mode == 'offset' and 'height' in gnss_fix and 'hMSL' in gnss_fix:
             self.geoid_offset = gnss_fix['height'] - gnss_fix['hMSL']
-        self.buffer.append(gnss_fix)
+        self._prev = self._last
+        self._last = gnss_fix
+        self._motion_record = self._motion()
 
-    def extrapolate(self, target_time=None):
+    def _motion(self):
         """
-        Extrapolate GNSS position to the given target_time (epoch seconds).
-        Returns a dict with extrapolated 'lat', 'lon', 'height', 'hMSL', and 'timestamp'.
+        Returns (last_fix, x, y, z, vx, vy, vz) for the newest fix, or None
+        if the buffer cannot be extrapolated yet. Positions are in meters and the
+        velocity in meters per second, both in ECEF.
         """
-        if not self.transformers_initialized or len(self.buffer) < 2:
+        last = self._last
+        prev = self._prev
+        if not self.transformers_initialized or prev is None:
             return None
-
-        last = self.buffer[-1]
-        prev = self.buffer[-2]
         
         # Validate the last two fixes have valid lat/lon
         try:
@@ -139,43 +256,60 @@ class GnssExtrapolator:
                     return None
                     
         except (ValueError, TypeError) as e:
-            logger.warning(f"Cannot extrapolate: Invalid lat/lon in buffer: {e}")
+            logger.warning(f"Cannot extrapolate: Invalid lat/lon in last fixes: {e}")
             return None
-        
-        if target_time is None:
-            target_time = time.time()
 
-        dt = target_time - last['timestamp']
-        if dt < 0:
-            return last.copy()
-
-        # Use ellipsoid height for all geodetic math
+        # Use ellipsoid height for all geodetic math.
+        # ENU is linear in ECEF, so the displacement is applied directly in ECEF
+        # and only the extrapolated point is converted back to lat/lon/height.
         h_last = last.get('height', 0)
-        h_prev = prev.get('height', 0)
-        # Convert both fixes to ENU coordinates
-        e1, n1, u1 = self.lla_to_enu(last['lat'], last['lon'], h_last)
-        e0, n0, u0 = self.lla_to_enu(prev['lat'], prev['lon'], h_prev)
+        x1, y1, z1 = _lla_to_ecef(last['lat'], last['lon'], h_last)
 
         # Use velocity if available, else estimate from last two fixes
         if all(k in last for k in ('velE', 'velN', 'velD')):
-            de = last['velE'] * dt
-            dn = last['velN'] * dt
-            du = last['velD'] * dt
+            # Rotate the local velocity into ECEF (velD points down, so up = -velD)
+            vx, vy, vz = self._enu_to_ecef_delta(last['velE'], last['velN'], -last['velD'])
         else:
             dt_pos = last['timestamp'] - prev['timestamp']
             if dt_pos == 0:
-                de = dn = du = 0
+                vx = vy = vz = 0.0
             else:
-                de = (e1 - e0) / dt_pos * dt
-                dn = (n1 - n0) / dt_pos * dt
-                du = (u1 - u0) / dt_pos * dt
+                x0, y0, z0 = _lla_to_ecef(prev['lat'], prev['lon'], prev.get('height', 0))
+                vx = (x1 - x0) / dt_pos
+                vy = (y1 - y0) / dt_pos
+                vz = (z1 - z0) / dt_pos
+        return last, x1, y1, z1, vx, vy, vz
+
+    def extrapolate(self, target_time=None):
+        """
+        Extrapolate GNSS position to the given target_time (epoch seconds).
+        Returns a dict with extrapolated 'lat', 'lon', 'height', 'hMSL', and 'timestamp'.
+        """
+        motion = self._motion_record
+        if motion is None:
+            return None
+        last, x1, y1, z1, vx, vy, vz = motion
 
-        e_ex = e1 + de
-        n_ex = n1 + dn
-        u_ex = u1 + du
+        if target_time is None:
+            target_time = time.time()
+
+        dt = target_time - last['timestamp']
+        if dt < 0:
+            return last.copy()
+        if dt < EXTRAPOLATE_MIN_DT:
+            # Same hMSL derivation as the extrapolated path (the geoid lookup is cached
+            # near the last position); GGA-derived fixes carry no 'hMSL' of their own
+            height = last.get('height', 0)
+            return {
+                'timestamp': target_time,
+                'lat': last['lat'],
+                'lon': last['lon'],
+                'height': height,
+                'hMSL': self.ellipsoid_to_hmsl(last['lat'], last['lon'], height),
+            }
 
         # Convert back to lat, lon, height (ellipsoid)
-        lat, lon, height = self.enu_to_lla(e_ex, n_ex, u_ex)
+        lat, lon, height = _extrapolate_core(x1, y1, z1, vx, vy, vz, dt)
         hmsl = self.ellipsoid_to_hmsl(lat, lon, height)
 
         extrapolated = {
@@ -185,4 +319,19 @@ class GnssExtrapolator:
             'height': height,
             'hMSL': hmsl,
         }
-        return extrapolated
\ No newline at end of file
+        return extrapolated
+
+    def extrapolate_batch(self, target_times):
+        """
+        Extrapolate GNSS position to many target_times (epoch seconds) at once.
+        Returns (lat, lon, height) arrays, one entry per target time, or None if
+        the buffer cannot be extrapolated yet. Times before the last fix map to
+        the last fix position.
+        """
+        motion = self._motion_record
+        if motion is None:
+            return None
+        last, x1, y1, z1, vx, vy, vz = motion
+
+        dt = np.maximum(np.asarray(target_times, dtype=np.float64) - last['timestamp'], 0.0)
+        return _ecef_to_lla_array(x1 + vx * dt, y1 + vy * dt, z1 + vz * dt)
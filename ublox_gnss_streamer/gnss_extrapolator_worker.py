@@ -1,18 +1,20 @@
 from threading import Event
 import threading
+import logging
 import time
 import json
 from ublox_gnss_streamer.gnss_extrapolator import GnssExtrapolator
 from ublox_gnss_streamer.utils.logger import logger
-from ublox_gnss_streamer.utils.threadsafe_deque import ThreadSafeDeque
+from ublox_gnss_streamer.utils.schemas import ExtraSample
+from ublox_gnss_streamer.utils.spsc_ring import DROP_LOG_EVERY, SpscRing
 
 class GnssExtrapolatorWorker:
     def __init__(
         self,
         gnss_extrapolator: GnssExtrapolator,
         stop_event: Event,
-        gnss_raw_queue: ThreadSafeDeque,
-        gnss_extra_queue: ThreadSafeDeque,
+        gnss_raw_queue: SpscRing,
+        gnss_extra_queue: SpscRing,
         extrapolate_interval: float = 0.0095  # Default extrapolation interval
     ):
         self.gnss_extrapolator = gnss_extrapolator
@@ -22,69 +24,80 @@ class GnssExtrapolatorWorker:
         self.extrapolate_interval = extrapolate_interval
         self._thread = None
 
+    def _handle_fix(self, gnss_data):
+        """Validates a new GNSS fix, adds it to the extrapolator and queues it unchanged."""
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Received GNSS data for extrapolation: %s", gnss_data)
+        
+        # Validate lat/lon values before processing
+        try:
+            lat_val = gnss_data.get("lat")
+            lon_val = gnss_data.get("lon")
+            
+            # Skip if lat/lon are empty strings, None, or not convertible to float
+            if lat_val is None or lon_val is None or lat_val == '' or lon_val == '':
+                logger.warning(f"Skipping GNSS extrapolation with invalid lat/lon: lat={lat_val}, lon={lon_val}")
+                return
+            
+            # Try to convert to float to validate
+            lat_float = float(lat_val)
+            lon_float = float(lon_val)
+            
+            # Basic range validation for lat/lon
+            if not (-90 <= lat_float <= 90) or not (-180 <= lon_float <= 180):
+                logger.warning(f"Skipping GNSS extrapolation with out-of-range lat/lon: lat={lat_float}, lon={lon_float}")
+                return
+                
+        except (ValueError, TypeError) as e:
+            logger.warning(f"Skipping GNSS extrapolation with non-numeric lat/lon: lat={lat_val}, lon={lon_val}, error={e}")
+            return
+        
+        # The popped fix is owned by this worker alone, so store the
+        # validated float values in place instead of copying it
+        gnss_data["lat"] = lat_float
+        gnss_data["lon"] = lon_float
+        
+        self.gnss_extrapolator.add_fix(gnss_data)
+        # Positional construction: (timestamp, gnss_time, lat, lon, quality, extrapolated)
+        self._publish(
+            ExtraSample(gnss_data["timestamp"], gnss_data["gnss_time"], lat_float, lon_float,
+                        gnss_data["quality"], False)  # Not extrapolated
+        )
+
+    def _publish(self, sample):
+        queue = self.gnss_extra_queue
+        if not queue.try_push(sample) and queue.dropped % DROP_LOG_EVERY == 1:
+            logger.warning("Extrapolated GNSS queue full (capacity %d); dropped newest sample, %d so far",
+                           queue.capacity, queue.dropped)
+
     def _worker_loop(self):
+        # Ticks are scheduled on a fixed monotonic cadence so the work time does not add drift
+        next_deadline = time.monotonic()
         while not self.stop_event.is_set():
-            if self.stop_event.wait(self.extrapolate_interval):
-                break
+            next_deadline += self.extrapolate_interval
+            delay = next_deadline - time.monotonic()
+            if delay > 0:
+                if self.stop_event.wait(delay):
+                    break
+            else:
+                # Running behind: restart the schedule instead of firing back-to-back ticks
+                next_deadline = time.monotonic()
 
-            if len(self.gnss_raw_queue) > 0:
-                # New GNSS fix available: add it, but do NOT extrapolate
-                gnss_data = self.gnss_raw_queue.popleft()
-                logger.debug(f"Received GNSS data for extrapolation: {gnss_data}")
-                
-                # Validate lat/lon values before processing
-                try:
-                    lat_val = gnss_data.get("lat")
-                    lon_val = gnss_data.get("lon")
-                    
-                    # Skip if lat/lon are empty strings, None, or not convertible to float
-                    if lat_val is None or lon_val is None or lat_val == '' or lon_val == '':
-                        logger.warning(f"Skipping GNSS extrapolation with invalid lat/lon: lat={lat_val}, lon={lon_val}")
-                        continue
-                    
-                    # Try to convert to float to validate
-                    lat_float = float(lat_val)
-                    lon_float = float(lon_val)
-                    
-                    # Basic range validation for lat/lon
-                    if not (-90 <= lat_float <= 90) or not (-180 <= lon_float <= 180):
-                        logger.warning(f"Skipping GNSS extrapolation with out-of-range lat/lon: lat={lat_float}, lon={lon_float}")
-                        continue
-                        
-                except (ValueError, TypeError) as e:
-                    logger.warning(f"Skipping GNSS extrapolation with non-numeric lat/lon: lat={lat_val}, lon={lon_val}, error={e}")
-                    continue
-                
-                # Create a copy with validated float values for the extrapolator
-                validated_gnss_data = gnss_data.copy()
-                validated_gnss_data["lat"] = lat_float
-                validated_gnss_data["lon"] = lon_float
-                
-                self.gnss_extrapolator.add_fix(validated_gnss_data)
-                self.gnss_extra_queue.append(
-                    {
-                        "timestamp": gnss_data["timestamp"],
-                        "gnss_time": gnss_data["gnss_time"],
-                        "lat": lat_float,
-                        "lon": lon_float,
-                        "quality": gnss_data["quality"],
-                        "extrapolated": False,  # Mark as not extrapolated
-                    }
-                )
+            # Take every fix that arrived since the last tick in one call
+            fixes = self.gnss_raw_queue.drain()
+            if fixes:
+                # New GNSS fixes available: add them, but do NOT extrapolate
+                for gnss_data in fixes:
+                    self._handle_fix(gnss_data)
             else:
                 # No new data: extrapolate to now and queue the result
                 extrapolated = self.gnss_extrapolator.extrapolate(target_time=time.time())
                 if extrapolated is not None:
-                    logger.debug(f"Extrapolated GNSS data: {extrapolated}")
-                    self.gnss_extra_queue.append(
-                        {
-                            "timestamp": extrapolated["timestamp"],
-                            "gnss_time": None,
-                            "lat": extrapolated["lat"],
-                            "lon": extrapolated["lon"],
-                            "quality": None,
-                            "extrapolated": True,  # Mark as extrapolated
-                        }
+                    if logger.isEnabledFor(logging.DEBUG):
+                        logger.debug("Extrapolated GNSS data: %s", extrapolated)
+                    self._publish(
+                        ExtraSample(extrapolated["timestamp"], None, extrapolated["lat"],
+                                    extrapolated["lon"], None, True)  # Extrapolated
                     )
                     
     def run(self):
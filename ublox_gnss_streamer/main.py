@@ -1,10 +1,14 @@
 import argparse
-import sys
-import logging
 from threading import Event
 import time
 import yaml
 
+# Use the libyaml-backed loader when PyYAML was built with it
+try:
+    from yaml import CSafeLoader as YamlLoader
+except ImportError:
+    from yaml import SafeLoader as YamlLoader
+
 from ublox_gnss_streamer.ublox_gnss import UbloxGnss
 from ublox_gnss_streamer.ublox_gnss_worker import UbloxGnssWorker
 from ublox_gnss_streamer.ntrip_client import NTRIPClient
@@ -14,8 +18,8 @@ from ublox_gnss_streamer.tcp_publisher_worker import TcpPublisherWorker
 from ublox_gnss_streamer.gnss_extrapolator import GnssExtrapolator
 from ublox_gnss_streamer.gnss_extrapolator_worker import GnssExtrapolatorWorker
 
-from ublox_gnss_streamer.utils.logger import logger, ColoredFormatter, ColoredLogger
-from ublox_gnss_streamer.utils.threadsafe_deque import ThreadSafeDeque
+from ublox_gnss_streamer.utils.logger import logger, configure as configure_logging
+from ublox_gnss_streamer.utils.spsc_ring import SpscRing
 
 def parse_args(argv=None):
     parser = argparse.ArgumentParser(
@@ -42,7 +46,7 @@ def parse_args(argv=None):
     )
     parser.add_argument(
         "-t", "--serial-timeout", type=float,
-        help="Timeout in secs for the serial connection",
+        help="Timeout in secs for the serial connection (bounds how long a read blocks on shutdown)",
         default=argparse.SUPPRESS
     )
     # parser.add_argument(
@@ -112,6 +116,19 @@ def parse_args(argv=None):
 
     return parser.parse_args(argv)
 
+def start_worker(worker, name, stop_event, initial_wait=0.5, max_wait=8.0):
+    """
+    Start a worker, retrying with exponential backoff while its run() reports
+    failure. Returns False if stop_event is set before the worker starts.
+    """
+    wait = initial_wait
+    while not worker.run():
+        logger.warning(f"{name} failed to start, retrying in {wait:.1f} s")
+        if stop_event.wait(wait):
+            return False
+        wait = min(wait * 2, max_wait)
+    return True
+
 def main(argv=None):
     args = parse_args(argv)
 
@@ -122,7 +139,7 @@ def main(argv=None):
     if hasattr(args, 'yaml_config'):
         try:
             with open(args.yaml_config, 'r') as file:
-                yaml_config = yaml.safe_load(file)
+                yaml_config = yaml.load(file, Loader=YamlLoader)
                 if yaml_config:
                     config_dict.update(yaml_config)
         except Exception as e:
@@ -133,15 +150,8 @@ def main(argv=None):
         config_dict[key] = value
             
     # Set up logging
-    logger.setLevel(getattr(logging, config_dict.get('logger_level', 'info').upper()))
-    if not logger.hasHandlers():
-        # This block ensures that the logger has a handler after class change
-        handler = logging.StreamHandler(sys.stdout)
-        handler.setLevel(getattr(logging, config_dict.get('logger_level', 'info').upper()))
-        formatter = ColoredFormatter(ColoredLogger.FORMAT)
-        handler.setFormatter(formatter)
-        logger.addHandler(handler)
-        
+    configure_logging(config_dict.get('logger_level', 'info'))
+
     logger.info("Starting ublox_gnss_streamer")
     
     # Log the final configuration
@@ -149,10 +159,13 @@ def main(argv=None):
         logger.info(f"Config {key}: {value}")
     
     stop_event = Event()
-    rtcm_queue = ThreadSafeDeque(maxlen=100)
-    nmea_queue = ThreadSafeDeque(maxlen=100)
-    gnss_raw_queue = ThreadSafeDeque(maxlen=100)
-    gnss_extra_queue = ThreadSafeDeque(maxlen=100)
+    # Every hand-off has exactly one producer and one consumer thread.
+    # A full ring rejects the newest item, so each capacity covers the longest
+    # consumer stall expected on that hand-off, not just the steady-state burst.
+    rtcm_queue = SpscRing(capacity=64)         # ~6-10 frames per epoch; several epochs across a slow serial write
+    nmea_queue = SpscRing(capacity=16)         # 20 Hz GGA; NTRIP loop sends only the newest each tick
+    gnss_raw_queue = SpscRing(capacity=32)     # 20 Hz fixes across a >1 s extrapolator stall
+    gnss_extra_queue = SpscRing(capacity=128)  # 100 Hz output across two clients each hitting the 0.5 s send timeout
     
     try:
         ublox_gnss_worker = UbloxGnssWorker(
@@ -171,7 +184,6 @@ def main(argv=None):
             nmea_queue=nmea_queue,
             rtcm_queue=rtcm_queue,
             gnss_queue=gnss_raw_queue,
-            poll_interval=0.01
         )
 
         ntrip_client_worker = NTRIPClientWorker(
@@ -203,8 +215,7 @@ def main(argv=None):
                 port=config_dict.get('tcp_port'),
             ),
             stop_event=stop_event,
-            gnss_queue=gnss_extra_queue,
-            broadcast_interval=0.001  # 1000 Hz broadcast rate
+            gnss_queue=gnss_extra_queue,  # broadcast loop wakes on push; broadcast_interval is unused
         )
         
         gnss_extrapolator_worker = GnssExtrapolatorWorker(
@@ -219,17 +230,14 @@ def main(argv=None):
             # extrapolate_interval=1.0
         )
         
-        while not ublox_gnss_worker.run():
-            time.sleep(1)
-        
-        while not ntrip_client_worker.run():
-            time.sleep(1)
-            
-        while not tcp_publisher_worker.run():
-            time.sleep(1)
-            
-        while not gnss_extrapolator_worker.run():
-            time.sleep(1)
+        for worker, name in (
+            (ublox_gnss_worker, "Ublox GNSS worker"),
+            (ntrip_client_worker, "NTRIP client worker"),
+            (tcp_publisher_worker, "TCP publisher worker"),
+            (gnss_extrapolator_worker, "GNSS extrapolator worker"),
+        ):
+            if not start_worker(worker, name, stop_event):
+                return
             
         logger.info("All workers started successfully.")
         
@@ -2,7 +2,7 @@ import logging
 
 NMEA_DEFAULT_MAX_LENGTH = 82
 NMEA_DEFAULT_MIN_LENGTH = 3
-_NMEA_CHECKSUM_SEPERATOR = "*"
+_NMEA_CHECKSUM_SEPERATOR = b"*"
 
 class NMEAParser:
 
@@ -18,6 +18,10 @@ class NMEAParser:
     self.nmea_min_length = NMEA_DEFAULT_MIN_LENGTH
 
   def is_valid_sentence(self, sentence):
+    # Checks run on bytes; text sentences are encoded once up front
+    if isinstance(sentence, str):
+      sentence = sentence.encode('utf-8')
+
     # Simple sanity checks
     if len(sentence) > self.nmea_max_length:
       self._logwarn('Received invalid NMEA sentence. Max length is {}, but sentence was {} bytes'.format(self.nmea_max_length, len(sentence)))
@@ -27,16 +31,16 @@ class NMEAParser:
       self._logwarn('Received invalid NMEA sentence. We need at least {} bytes to parse but got {} bytes'.format(self.nmea_min_length, len(sentence)))
       self._logwarn('Sentence: {}'.format(sentence))
       return False
-    if sentence[0] != '$' and sentence[0] != '!':
-      self._logwarn('Received invalid NMEA sentence. Sentence should begin with "$" or "!", but instead begins with {}'.format(sentence[0]))
+    if sentence[:1] != b'$' and sentence[:1] != b'!':
+      self._logwarn('Received invalid NMEA sentence. Sentence should begin with "$" or "!", but instead begins with {}'.format(sentence[:1]))
       self._logwarn('Sentence: {}'.format(sentence))
       return False
-    if sentence[-2:] != '\r\n':
+    if sentence[-2:] != b'\r\n':
       self._logwarn('Received invalid NMEA sentence. Sentence should end with \\r\\n, but instead ends with {}'.format(sentence[-2:]))
       self._logwarn('Sentence: {}'.format(sentence))
       return False
     if _NMEA_CHECKSUM_SEPERATOR not in sentence:
-      self._logwarn('Received invalid NMEA sentence. Sentence should have a "{}" character to seperate the checksum, but we could not find it.'.format(_NMEA_CHECKSUM_SEPERATOR))
+      self._logwarn('Received invalid NMEA sentence. Sentence should have a "{}" character to seperate the checksum, but we could not find it.'.format(_NMEA_CHECKSUM_SEPERATOR.decode()))
       self._logwarn('Sentence: {}'.format(sentence))
       return False
 
@@ -44,8 +48,8 @@ class NMEAParser:
     data, expected_checksum_str = sentence.rsplit(_NMEA_CHECKSUM_SEPERATOR, 1)
     expected_checksum = int(expected_checksum_str, 16)
     calculated_checksum = 0
-    for char in data[1:]:
-      calculated_checksum ^= ord(char)
+    for byte in data[1:]:
+      calculated_checksum ^= byte
     if expected_checksum != calculated_checksum:
       self._logwarn('Received invalid NMEA sentence. Checksum mismatch');
       self._logwarn('Expected Checksum:   0x{:X}'.format(expected_checksum))
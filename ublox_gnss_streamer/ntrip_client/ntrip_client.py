@@ -14,6 +14,8 @@ from .rtcm_parser import RTCMParser
 from ublox_gnss_streamer.utils.logger import logger
 
 _CHUNK_SIZE = 1024
+# Reusable receive buffer; anything beyond this is left in the socket for the next call
+_RX_BUFFER_SIZE = 64 * 1024
 _SOURCETABLE_RESPONSES = [
   'SOURCETABLE 200 OK'
 ]
@@ -74,6 +76,10 @@ class NTRIPClient:
     self._raw_socket = None
     self._server_socket = None
 
+    # Socket reads land here instead of in a new bytes object per chunk
+    self._rx_buffer = bytearray(_RX_BUFFER_SIZE)
+    self._rx_view = memoryview(self._rx_buffer)
+
     # Setup some parsers to parse incoming messages
     self.rtcm_parser = RTCMParser(
       logerr=logerr,
@@ -234,20 +240,24 @@ class NTRIPClient:
       self._logwarn('NMEA sent before client was connected, discarding NMEA')
       return
 
+    # Sentences read from the receiver arrive as bytes; encode text once so the rest is bytes only
+    if isinstance(sentence, str):
+      sentence = sentence.encode('utf-8')
+
     # Not sure if this is the right thing to do, but python will escape the return characters at the end of the string, so do this manually
-    if sentence[-4:] == '\\r\\n':
-      sentence = sentence[:-4] + '\r\n'
-    elif sentence[-2:] != '\r\n':
-      sentence = sentence + '\r\n'
+    if sentence[-4:] == b'\\r\\n':
+      sentence = sentence[:-4] + b'\r\n'
+    elif sentence[-2:] != b'\r\n':
+      sentence = sentence + b'\r\n'
 
     # Check if it is a valid NMEA sentence
     if not self.nmea_parser.is_valid_sentence(sentence):
       self._logwarn("Invalid NMEA sentence, not sending to server")
       return
 
-    # Encode the data and send it to the socket
+    # Send the data to the socket
     try:
-      self._server_socket.send(sentence.encode('utf-8'))
+      self._server_socket.send(sentence)
     except Exception as e:
       self._logwarn('Unable to send NMEA sentence to server.')
       self._logwarn('Exception: {}'.format(str(e)))
@@ -277,13 +287,13 @@ class NTRIPClient:
       return []
 
     # Since we only ever pass the server socket to the list of read sockets, we can just read from that
-    # Read all available data into a buffer
-    data = b''
-    while True:
+    # Read all available data into the reusable receive buffer
+    length = 0
+    while length < _RX_BUFFER_SIZE:
       try:
-        chunk = self._server_socket.recv(_CHUNK_SIZE)
-        data += chunk
-        if len(chunk) < _CHUNK_SIZE:
+        read = self._server_socket.recv_into(self._rx_view[length:length + _CHUNK_SIZE])
+        length += read
+        if read < _CHUNK_SIZE:
           break
       except Exception as e:
         self._logerr('Error while reading {} bytes from socket'.format(_CHUNK_SIZE))
@@ -292,7 +302,9 @@ class NTRIPClient:
           self.reconnect()
           return []
         break
-    self._logdebug('Read {} bytes'.format(len(data)))
+    # One copy out of the buffer; the parsed frames are handed to other threads and must own their bytes
+    data = bytes(self._rx_view[:length])
+    self._logdebug('Read {} bytes'.format(length))
 
     # If 0 bytes were read from the socket even though we were told data is available multiple times,
     # it can be safely assumed that we can reconnect as the server has closed the connection
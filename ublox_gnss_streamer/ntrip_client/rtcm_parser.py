@@ -63,6 +63,11 @@ class RTCMParser:
     index = 0
     rtcm_packets = []
     while index < len(combined_buffer):
+      # Jump to the next preamble byte with a C-level scan instead of stepping through every byte here
+      index = combined_buffer.find(_RTCM_3_2_PREAMBLE, index)
+      if index < 0:
+        break
+
       # Find the start of the RTCM 3.2 packet
       if combined_buffer[index] == _RTCM_3_2_PREAMBLE:
         # Make sure we have enough data to find the length
@@ -78,7 +83,7 @@ class RTCMParser:
           # Grab the packet from the buffer, and verify that it is valid by comparing checksums
           packet = combined_buffer[index:index + message_length + 6]
           expected_checksum = packet[-3] << 16 | packet[-2] << 8 | packet[-1]
-          actual_checksum = self._checksum(packet[:-3])
+          actual_checksum = self._checksum(packet, len(packet) - 3)
           if expected_checksum == actual_checksum:
             self._logdebug('Found valid packet at {} with length {}'.format(index, message_length))
             rtcm_packets.append(packet)
@@ -111,8 +116,12 @@ class RTCMParser:
     # Return the RTCM packets we found
     return rtcm_packets
     
-  def _checksum(self, packet):
+  def _checksum(self, packet, length=None):
+    # CRC-24Q over packet[:length]; iterating a memoryview avoids copying the slice,
+    # and the table is bound locally so each byte costs no global lookup
+    lookup = _RTCM_CRC_LOOKUP
+    data = packet if length is None else memoryview(packet)[:length]
     crc = 0
-    for byte in packet:
-      crc = ((crc << 8) & 0xFFFFFF) ^ _RTCM_CRC_LOOKUP[(crc >> 16) ^ byte]
+    for byte in data:
+      crc = ((crc & 0xFFFF) << 8) ^ lookup[(crc >> 16) ^ byte]
     return crc
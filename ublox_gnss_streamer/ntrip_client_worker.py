@@ -1,10 +1,11 @@
 from threading import Thread, Event, Lock
 from collections import deque
+import logging
 import time
 
 from .ntrip_client import NTRIPClient
 from ublox_gnss_streamer.utils.logger import logger
-from ublox_gnss_streamer.utils.threadsafe_deque import ThreadSafeDeque
+from ublox_gnss_streamer.utils.spsc_ring import DROP_LOG_EVERY, SpscRing
 
 class NTRIPClientWorker:
     def __init__(
@@ -12,8 +13,8 @@ class NTRIPClientWorker:
         client: NTRIPClient,
         ntrip_server_hz=1,
         stop_event: Event = None,
-        nmea_queue: ThreadSafeDeque = None,
-        rtcm_queue: ThreadSafeDeque = None,
+        nmea_queue: SpscRing = None,
+        rtcm_queue: SpscRing = None,
         **kwargs
     ):
         self._client = client
@@ -44,49 +45,80 @@ class NTRIPClientWorker:
                 logger.error(f"Failed to open serial port {self._serial_port}: {e}")
                 return
         
+        # Pick the RTCM sink once instead of branching on it for every frame
+        if self._serial_stream:
+            emit = self._serial_stream.write
+            emit_errors = serial.SerialException
+            sink_name = "serial"
+        elif self.rtcm_queue is not None:
+            rtcm_queue = self.rtcm_queue
+
+            def emit(rtcm):
+                if not rtcm_queue.try_push(rtcm) and rtcm_queue.dropped % DROP_LOG_EVERY == 1:
+                    logger.warning("RTCM queue full (capacity %d); dropped newest frame, %d so far",
+                                   rtcm_queue.capacity, rtcm_queue.dropped)
+
+            emit_errors = ()
+            sink_name = "queue"
+        else:
+            emit = None
+
         rtcm_count = 0
-        last_rate_time = time.time()
+        last_rate_ns = time.monotonic_ns()
+
+        # Absolute deadlines keep the request cadence from drifting by the loop's own runtime
+        next_deadline = time.monotonic() + self.rtcm_request_rate
 
         while not self.stop_event.is_set():
-            if self.stop_event.wait(self.rtcm_request_rate):
+            if self.stop_event.wait(max(0.0, next_deadline - time.monotonic())):
                 break
-            
+            next_deadline += self.rtcm_request_rate
+            now = time.monotonic()
+            if next_deadline < now:
+                # Fell behind (e.g. a slow recv); resync rather than bursting to catch up
+                next_deadline = now + self.rtcm_request_rate
+
+            # Checked once per tick so disabled debug logging never formats payloads
+            debug_enabled = logger.isEnabledFor(logging.DEBUG)
+
             # get nmea and send
             if self.nmea_queue is not None:
-                if len(self.nmea_queue) > 0:
-                    nmea = self.nmea_queue.popleft()
-                    logger.debug(f"Received NMEA: {nmea}")
+                # The receiver can emit GGA faster than this loop ticks; only the
+                # newest position matters to the caster, so send that one
+                pending = self.nmea_queue.drain()
+                nmea = pending[-1] if pending else None
+                if nmea is not None:
+                    if debug_enabled:
+                        logger.debug("Received NMEA: %s", nmea)
                     self._client.send_nmea(nmea)
-                else:
+                elif debug_enabled:
                     logger.debug("NMEA RX queue is empty")
                         
-            # get rtcm from ntrip and send to rtcm_queue
-            if self.rtcm_queue is not None:
-                for rtcm in self._client.recv_rtcm():
+            # get rtcm from ntrip and send to serial or rtcm_queue; always drained
+            # so the caster's data never backs up in the socket
+            rtcm_frames = self._client.recv_rtcm()
+            if emit is not None:
+                for rtcm in rtcm_frames:
                     if rtcm is not None:
-                        # logger.debug(f"Received RTCM: {rtcm}")
-                        if self._serial_stream:
-                            try:
-                                self._serial_stream.write(rtcm)
-                                logger.debug(f"Sent RTCM to serial: {rtcm}")
-                            except serial.SerialException as e:
-                                logger.error(f"Failed to write to serial port: {e}")
-                        else:
-                            self.rtcm_queue.append(rtcm)
-                            logger.debug(f"Appended RTCM to queue: {rtcm}")
-                        
-            rtcm_count += 1
-            
-            if rtcm_count % 10 == 0:  # Report every 10 requests
-                current_time = time.time()
-                elapsed_time = current_time - last_rate_time
-                if elapsed_time > 0:
-                    rate = rtcm_count / elapsed_time
-                    logger.info(f"RTCM request rate: {rate:.2f} Hz")
-                    last_rate_time = current_time
-                    rtcm_count = 0
-                
-            
+                        try:
+                            emit(rtcm)
+                        except emit_errors as e:
+                            logger.error(f"Failed to write RTCM to {sink_name}: {e}")
+                            continue
+                        if debug_enabled:
+                            logger.debug("Sent RTCM to %s: %r", sink_name, rtcm)
+
+            # The request rate is only measured when it would actually be logged
+            if logger.isEnabledFor(logging.INFO):
+                rtcm_count += 1
+                if rtcm_count >= 10:  # Report every 10 requests
+                    now_ns = time.monotonic_ns()
+                    elapsed_ns = now_ns - last_rate_ns
+                    if elapsed_ns > 0:
+                        logger.info("RTCM request rate: %.2f Hz", rtcm_count * 1e9 / elapsed_ns)
+                        last_rate_ns = now_ns
+                        rtcm_count = 0
+
     def run(self):
 
         if not self._client.connect():
@@ -1,13 +1,32 @@
+import select
 import socket
+import threading
 
 from ublox_gnss_streamer.utils.logger import logger
 
+# Per-client kernel send buffer; several seconds of GNSS JSON lines
+CLIENT_SNDBUF_BYTES = 64 * 1024
+
+# A client whose send buffer stays full this long is dropped instead of stalling the broadcast
+CLIENT_SEND_TIMEOUT_SECONDS = 0.5
+
+HAS_SENDMSG = hasattr(socket.socket, "sendmsg")
+
+HAS_POLL = hasattr(select, "poll")
+if HAS_POLL:
+    # POLLRDHUP (Linux) reports a peer shutdown without data being sent
+    _DEAD_MASK = select.POLLHUP | select.POLLERR | select.POLLNVAL | getattr(select, "POLLRDHUP", 0)
+
 class TcpPublisher:
     def __init__(self, host, port):
         self.host = host
         self.port = port
         self.server_socket = None
-        self.clients = []
+        # Copy-on-write: writers swap in a new tuple under _clients_lock, so the
+        # broadcast thread can iterate whatever tuple it read without locking
+        self.clients = ()
+        self._clients_lock = threading.Lock()
+        self._poll = select.poll() if HAS_POLL else None
 
     def start_server(self):
         self.server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
@@ -20,35 +39,92 @@ class TcpPublisher:
             self.server_socket.close()
             self.server_socket = None
             logger.info("TCP server stopped.")
-        for client in self.clients:
-            try:
-                client.close()
-            except Exception as e:
-                logger.error(f"Error closing client socket: {e}", exc_info=True)
-        self.clients.clear()
+        with self._clients_lock:
+            clients = self.clients
+            self.clients = ()
+            if self._poll is not None:
+                for client in clients:
+                    try:
+                        self._poll.unregister(client)
+                    except (KeyError, ValueError):
+                        pass
+        # Closed separately so a failed unregister can never leave a socket open
+        for client in clients:
+            self._close_client(client)
         logger.info("All client connections closed.")
 
     def accept_client(self):
         client, addr = self.server_socket.accept()
-        self.clients.append(client)
+        client.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        client.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, CLIENT_SNDBUF_BYTES)
+        client.settimeout(CLIENT_SEND_TIMEOUT_SECONDS)
+        with self._clients_lock:
+            if self._poll is not None:
+                self._poll.register(client, _DEAD_MASK)
+            self.clients = self.clients + (client,)
         logger.info(f"Client connected: {addr}")
 
     def send_to_all(self, data):
-        for client in self.clients[:]:
+        """Send one payload to every client; same path as send_to_all_vec()."""
+        self.send_to_all_vec((data,))
+
+    def send_to_all_vec(self, payloads):
+        """Send a batch of payloads to every client with one sendmsg (writev) call each."""
+        if not payloads:
+            return
+        # Iterate the current snapshot and defer removals, so the common no-failure path allocates nothing
+        total = sum(len(p) for p in payloads)
+        joined = None
+        dead = None
+        for client in self.clients:
             try:
-                client.sendall(data)
+                if HAS_SENDMSG:
+                    sent = client.sendmsg(payloads)
+                else:
+                    sent = 0
+                if sent < total:
+                    # Short write (or no sendmsg on this platform): push the tail
+                    # One joined view shared by all clients; slicing it copies nothing
+                    if joined is None:
+                        joined = memoryview(b''.join(payloads))
+                    client.sendall(joined[sent:])
             except Exception as e:
-                self.clients.remove(client)
+                if dead is None:
+                    dead = []
+                dead.append(client)
                 logger.warning(f"Removed client due to send failure: {e}", exc_info=True)
+        if dead:
+            self._drop_clients(dead)
     
     def refresh_clients(self):
         """Remove closed sockets from the client list."""
-        self.clients = [c for c in self.clients if self._is_socket_open(c)]
-        logger.debug(f"Active clients refreshed. Current count: {len(self.clients)}")
-        
-    def _is_socket_open(self, sock):
+        # Without poll() (e.g. Windows) liveness is passive: a closed client is
+        # dropped by the first send that fails, so no per-client probe is needed
+        if self._poll is not None:
+            # One poll() covers every client; only hung-up/errored fds are reported
+            with self._clients_lock:
+                dead_fds = {fd for fd, mask in self._poll.poll(0) if mask & _DEAD_MASK}
+                dead = [c for c in self.clients if c.fileno() in dead_fds] if dead_fds else None
+            if dead:
+                self._drop_clients(dead)
+        logger.debug("Active clients refreshed. Current count: %d", len(self.clients))
+
+    def _drop_clients(self, dead):
+        """Swap in a client tuple without the given sockets, then close them."""
+        dead = set(dead)
+        with self._clients_lock:
+            self.clients = tuple(c for c in self.clients if c not in dead)
+            if self._poll is not None:
+                for client in dead:
+                    try:
+                        self._poll.unregister(client)
+                    except (KeyError, ValueError):
+                        pass
+        for client in dead:
+            self._close_client(client)
+
+    def _close_client(self, client):
         try:
-            sock.send(b'')
-            return True
-        except Exception:
-            return False
\ No newline at end of file
+            client.close()
+        except OSError:
+            pass
\ No newline at end of file
@@ -1,31 +1,70 @@
 import threading
 from threading import Event
+import math
+import selectors
 import socket
 from datetime import datetime, timezone, timedelta
+from json.encoder import encode_basestring
 
 from .tcp_publisher import TcpPublisher
 from ublox_gnss_streamer.utils.logger import logger
-from ublox_gnss_streamer.utils.schemas import GnssDataSchema
-from ublox_gnss_streamer.utils.threadsafe_deque import ThreadSafeDeque
+from ublox_gnss_streamer.utils.spsc_ring import SpscRing
+
+KST = timezone(timedelta(hours=9))
+
+# Upper bound on payloads coalesced into one sendmsg per client
+BROADCAST_BATCH_MAX = 32
+
+# Longest the broadcast loop sleeps on an idle queue before re-checking stop_event
+BROADCAST_IDLE_WAIT_SECONDS = 0.5
+
+# NMEA GGA quality indicator -> published 'type'
+QUALITY_TYPES = {
+    0: "no-fix",
+    1: "sps",
+    2: "dgps",
+    3: "pps",
+    4: "fixed-rtk",
+    5: "float-rtk",
+    6: "dead-reckoning",
+}
+
+# Same fields and compact layout as GnssDataSchema.json(), filled in directly so
+# each sample skips pydantic model construction and validation
+GNSS_LINE_FORMAT = '{"timestamp":"%s","gnss_time":%s,"lat":%r,"lon":%r,"type":"%s"}\n'
 
 class TcpPublisherWorker:
     def __init__(
         self, 
         publisher: TcpPublisher, 
         stop_event: Event,
-        gnss_queue: ThreadSafeDeque = None,
-        broadcast_interval: float = 0.01,  # Default broadcast interval
+        gnss_queue: SpscRing = None,
+        broadcast_interval: float = 0.01,  # Poll interval if gnss_queue cannot signal (no wait())
     ):
         self.publisher = publisher
         self.gnss_queue = gnss_queue
         self.stop_event = stop_event
-        self.publisher_lock = threading.Lock()
         self.accept_thread = None
         self.broadcast_thread = None
-        self.broadcast_interval = broadcast_interval  # Interval for broadcasting data
+        self.broadcast_interval = broadcast_interval  # Fallback poll interval only; SpscRing wakes the loop on push
+        self._accept_selector = None
+        self._wake_r = None
+        self._wake_w = None
+        # Whole-second prefix of the last formatted timestamp (broadcast thread only)
+        self._ts_second = None
+        self._ts_prefix = None
     
     def run(self):
         self.publisher.start_server()
+
+        # The accept thread sleeps in select() on the listener plus a wake socket
+        # that stop() writes to, instead of polling stop_event on a socket timeout
+        self.publisher.server_socket.setblocking(False)
+        self._wake_r, self._wake_w = socket.socketpair()
+        self._accept_selector = selectors.DefaultSelector()
+        self._accept_selector.register(self.publisher.server_socket, selectors.EVENT_READ)
+        self._accept_selector.register(self._wake_r, selectors.EVENT_READ)
+
         self.accept_thread = threading.Thread(target=self._accept_clients_loop, daemon=True)
         self.accept_thread.start()
         self.broadcast_thread = threading.Thread(target=self._broadcast_data_loop, daemon=True)
@@ -35,120 +74,130 @@ class TcpPublisherWorker:
     
     def _accept_clients_loop(self):
         while not self.stop_event.is_set():
-            try:
-                self.publisher.server_socket.settimeout(1.0)
+            for key, _ in self._accept_selector.select():
+                if key.fileobj is self._wake_r:
+                    return
                 try:
-                    self.publisher.accept_client()
-                except socket.timeout:
-                    continue
-                with self.publisher_lock:
+                    try:
+                        self.publisher.accept_client()
+                    except BlockingIOError:
+                        # The pending connection went away between select() and accept()
+                        continue
                     self.publisher.refresh_clients()
-            except Exception as e:
-                logger.error(f"Error accepting client: {e}", exc_info=True)
+                except Exception as e:
+                    logger.error(f"Error accepting client: {e}", exc_info=True)
     
     def _broadcast_data_loop(self):
-        
-        KST = timezone(timedelta(hours=9))
+        if self.gnss_queue is None:
+            return
+
+        # Sleep until the extrapolator pushes instead of waking on a fixed 1 kHz tick
+        wait_for_data = getattr(self.gnss_queue, "wait", None)
 
         while not self.stop_event.is_set():
-            if self.stop_event.wait(self.broadcast_interval):
+            if wait_for_data is not None:
+                if not wait_for_data(BROADCAST_IDLE_WAIT_SECONDS):
+                    continue
+            elif self.stop_event.wait(self.broadcast_interval):
                 break
-            
-            if self.gnss_queue is not None and len(self.gnss_queue) > 0:
-                raw = self.gnss_queue.popleft()
 
-                # Validate lat/lon values before processing
-                try:
-                    lat_val = raw.get("lat")
-                    lon_val = raw.get("lon")
-                    
-                    # Skip if lat/lon are empty strings, None, or not convertible to float
-                    if lat_val is None or lon_val is None or lat_val == '' or lon_val == '':
-                        logger.warning(f"Skipping GNSS data with invalid lat/lon: lat={lat_val}, lon={lon_val}")
-                        continue
-                    
-                    # Try to convert to float to validate
-                    lat_float = float(lat_val)
-                    lon_float = float(lon_val)
-                    
-                    # Basic range validation for lat/lon
-                    if not (-90 <= lat_float <= 90) or not (-180 <= lon_float <= 180):
-                        logger.warning(f"Skipping GNSS data with out-of-range lat/lon: lat={lat_float}, lon={lon_float}")
-                        continue
-                        
-                except (ValueError, TypeError) as e:
-                    logger.warning(f"Skipping GNSS data with non-numeric lat/lon: lat={lat_val}, lon={lon_val}, error={e}")
-                    continue
+            payloads = []
+            while len(payloads) < BROADCAST_BATCH_MAX:
+                raw = self.gnss_queue.try_pop()
+                if raw is None:
+                    break
+                payload = self._encode(raw)
+                if payload is not None:
+                    payloads.append(payload)
+
+            if payloads:
+                # TcpPublisher's client list is copy-on-write, so broadcasting needs no lock
+                self.publisher.send_to_all_vec(payloads)
+
+    def _encode(self, raw):
+        # ExtraSample lat/lon are floats already validated by the extrapolator worker,
+        # so a range check is enough here (NaN fails it too)
+        lat_float = raw.lat
+        lon_float = raw.lon
+        try:
+            in_range = -90.0 <= lat_float <= 90.0 and -180.0 <= lon_float <= 180.0
+        except TypeError:
+            in_range = False
+        if not in_range:
+            logger.warning(f"Skipping GNSS data with invalid lat/lon: lat={lat_float}, lon={lon_float}")
+            return None
+
+        # Determine 'type' field
+        # if raw.get("extrapolated"):
+        #     type_str = "extrapolated"
+        # elif not raw.get("gnssFixOk"):
+        #     type_str = "no-fix"
+        # elif raw.get("fixType") == 3 and raw.get("carrSoln") == 2:
+        #     type_str = "fixed-rtk"
+        # elif raw.get("fixType") == 3 and raw.get("carrSoln") == 1:
+        #     type_str = "float-rtk"
+        # elif raw.get("fixType") == 3 and raw.get("carrSoln") == 0:
+        #     type_str = "no-rtk"
+        # elif raw.get("fixType") == 4:
+        #     type_str = "dead-reckoning"
+        # else:
+        #     type_str = "no-rtk"
+        
+        if raw.extrapolated:
+            type_str = "extrapolated"
+        else:
+            type_str = QUALITY_TYPES.get(raw.quality, "unknown")
+
+        # Convert timestamp to KST
+        ts = raw.timestamp
+        if isinstance(ts, datetime):
+            ts_str = ts.astimezone(KST).isoformat()
+        else:
+            ts_str = self._format_kst(ts)
+
+        return (GNSS_LINE_FORMAT % (
+            ts_str,
+            encode_basestring(str(raw.gnss_time)),
+            lat_float,
+            lon_float,
+            type_str,
+        )).encode('utf-8')
+
+    def _format_kst(self, ts):
+        """
+        Same string as datetime.fromtimestamp(ts, tz=KST).isoformat(), but the
+        date/time part is only rebuilt when the second changes (KST has no DST).
+        """
+        # Split and round exactly like datetime.fromtimestamp (half-even to 1 us)
+        frac, second = math.modf(ts)
+        micros = round(frac * 1e6)
+        if micros >= 1000000:
+            second += 1.0
+            micros -= 1000000
+        elif micros < 0:
+            second -= 1.0
+            micros += 1000000
+        if second != self._ts_second:
+            self._ts_second = second
+            self._ts_prefix = datetime.fromtimestamp(second, tz=KST).isoformat()[:-6]
+        if micros:
+            return "%s.%06d+09:00" % (self._ts_prefix, micros)
+        return self._ts_prefix + "+09:00"
 
-                # Determine 'type' field
-                # if raw.get("extrapolated"):
-                #     type_str = "extrapolated"
-                # elif not raw.get("gnssFixOk"):
-                #     type_str = "no-fix"
-                # elif raw.get("fixType") == 3 and raw.get("carrSoln") == 2:
-                #     type_str = "fixed-rtk"
-                # elif raw.get("fixType") == 3 and raw.get("carrSoln") == 1:
-                #     type_str = "float-rtk"
-                # elif raw.get("fixType") == 3 and raw.get("carrSoln") == 0:
-                #     type_str = "no-rtk"
-                # elif raw.get("fixType") == 4:
-                #     type_str = "dead-reckoning"
-                # else:
-                #     type_str = "no-rtk"
-                
-                if raw.get("extrapolated"):
-                    type_str = "extrapolated"
-                elif raw.get("quality") == 0:
-                    type_str = "no-fix"
-                elif raw.get("quality") == 1:
-                    type_str = "sps"
-                elif raw.get("quality") == 2:
-                    type_str = "dgps"
-                elif raw.get("quality") == 3:
-                    type_str = "pps"
-                elif raw.get("quality") == 4:
-                    type_str = "fixed-rtk"
-                elif raw.get("quality") == 5:
-                    type_str = "float-rtk"
-                elif raw.get("quality") == 6:
-                    type_str = "dead-reckoning"
-                else:
-                    type_str = "unknown"
-
-                # Convert timestamp to KST
-                ts = raw["timestamp"]
-                if isinstance(ts, datetime):
-                    ts = ts.astimezone(KST)
-                else:
-                    ts = datetime.fromtimestamp(ts, tz=KST)
-                    
-                # Build the schema using validated float values
-                gnss_data = GnssDataSchema(
-                    timestamp=ts,
-                    gnss_time=str(raw["gnss_time"]),
-                    lat=lat_float,
-                    lon=lon_float,
-                    # alt=raw["height"],
-                    type=type_str,
-                    # fixType=raw.get("fixType"),
-                    # carrSoln=raw.get("carrSoln"),
-                    # gnssFixOk=raw.get("gnssFixOk"),
-                    # extrapolationError=raw.get("extrapolationError")
-                )
-
-                with self.publisher_lock:
-                    self.publisher.send_to_all(
-                        data=gnss_data.json().encode('utf-8') + b'\n'
-                    )
-                    
-    
     def stop(self):
         self.stop_event.set()
+        if self.gnss_queue is not None and hasattr(self.gnss_queue, "wake"):
+            self.gnss_queue.wake()
+        if self._wake_w is not None:
+            self._wake_w.send(b'\0')
         if self.accept_thread:
             self.accept_thread.join()
+        if self._accept_selector is not None:
+            self._accept_selector.close()
+            self._wake_r.close()
+            self._wake_w.close()
         if self.broadcast_thread:
             self.broadcast_thread.join()
-        with self.publisher_lock:
-            self.publisher.stop_server()
+        self.publisher.stop_server()
         logger.info("TCP Publisher worker stopped.")
         
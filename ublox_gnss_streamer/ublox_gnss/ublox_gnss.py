@@ -1,7 +1,7 @@
 
 from queue import Empty, Queue
 from collections import deque
-from threading import Event, Thread
+from threading import Event, Lock, Thread
 import time
 
 from serial import Serial
@@ -46,6 +46,11 @@ class UbloxGnss:
 
         self.port = port
         self.baudrate = baudrate
+        # poll() blocks in the serial read for up to this long, so it bounds how quickly
+        # the reader notices a stop request; it does not pace the reads. The worker has
+        # no sleep of its own, so a non-blocking port would make it spin
+        if timeout is not None and timeout <= 0:
+            raise ValueError(f"Invalid serial timeout: {timeout}. Must be positive (or None to block).")
         self.timeout = timeout
         self.enableubx = kwargs.get("enableubx", False)
         self.enablenmea = kwargs.get("enablenmea", False)
@@ -55,6 +60,10 @@ class UbloxGnss:
         # self.port_type = kwargs.get("port_type", "USB")  # Default to USB, can be changed to UART1 or UART2
         self.stream = None
         self.connected = DISCONNECTED
+        # RTCM is written from the worker's writer thread while config() may write from
+        # the caller; whole frames must not interleave on the port
+        self._write_lock = Lock()
+        self._prepare_configs()
         
         # if self.port_type not in PORT_TYPE:
         #     raise ValueError(f"Invalid port type: {self.port_type}. Must be one of {PORT_TYPE}.")
@@ -73,7 +82,8 @@ class UbloxGnss:
         
     def _send_data(self, data):
         if self.stream and self.connected == CONNECTED:
-            self.stream.write(data)
+            with self._write_lock:
+                self.stream.write(data)
             logger.debug("Sent config data directly.")
             return True
         else:
@@ -102,66 +112,74 @@ class UbloxGnss:
             logger.debug("RTCM data sent.")
         
     def config(self):
-        layers = 1
-        transaction = 0
-        cfg_data = []
+        self._send_data(self._cfg_out_ubx_blob)
+        self._send_data(self._cfg_out_nmea_blob)
+        self._send_data(self._cfg_in_rtcm_blob)
+        logger.debug("Sent config data to enable RTCM input and UBX/NMEA output.")
+
+        self._send_data(self._cfg_dynmodel_blob)
+        logger.debug("Sent config data to set dynamic model to automotive.")
+
+        self._send_data(self._cfg_rate_blob)
+        logger.debug("Sent config data to set measurement rate, navigation rate and navigation priority rate.")
+
+    def _prepare_configs(self):
+        """
+        Serialize the CFG-VALSET messages sent by config().
+        They depend only on settings fixed in __init__, so they are built once
+        and config() (e.g. on a reconnect) just writes the stored bytes.
+        """
+        # Port enables (CFG_{port}_ENABLED) are left at the receiver's defaults; with
+        # port_type selection disabled there is no per-port message to send
         # for port_type in ("USB", "UART1", "UART2"):
         #     # if port_type == self.port_type:
         #     #     cfg_data.append((f"CFG_{port_type}_ENABLED", True))
         #     # else:
         #     #     cfg_data.append((f"CFG_{port_type}_ENABLED", False))
         #     cfg_data.append((f"CFG_{port_type}_ENABLED", True))
-        
-        msg = UBXMessage.config_set(layers, transaction, cfg_data)
-        self._send_data(msg.serialize())
-        
-        self._enable_out_ubx(self.enableubx)
-        self._enable_out_nmea(self.enablenmea)
-        self._enable_in_rtcm(True)
-        logger.debug("Sent config data to enable RTCM input and UBX/NMEA output.")
-        
-        layers = 1
-        transaction = 0
-        cfg_data = [] 
+
+        self._cfg_out_ubx_blob = self._cfg_out_ubx(self.enableubx)
+        self._cfg_out_nmea_blob = self._cfg_out_nmea(self.enablenmea)
+        self._cfg_in_rtcm_blob = self._cfg_in_rtcm(True)
+
+        cfg_data = []
         # config Dynamic Model as automotive
         # cfg_data.append(("CFG_NAVSPG_DYNMODEL", 4)) # 4 = automotive
         cfg_data.append(("CFG_NAVSPG_DYNMODEL", 0)) # 4 = portable
-        msg = UBXMessage.config_set(layers, transaction, cfg_data)
-        self._send_data(msg.serialize())
-        logger.debug("Sent config data to set dynamic model to automotive.")
-        
-        layers = 1
-        transaction = 0
-        cfg_data = [] 
+        self._cfg_dynmodel_blob = self._config_set(cfg_data)
+
+        cfg_data = []
         # cfg rate
         cfg_data.append(("CFG_RATE_MEAS", self.measrate))
         cfg_data.append(("CFG_RATE_NAV", self.navrate))
         cfg_data.append(("CFG_RATE_NAV_PRIO", self.navpriorate))
+        self._cfg_rate_blob = self._config_set(cfg_data)
+
+    @staticmethod
+    def _config_set(cfg_data):
+        layers = 1
+        transaction = 0
         msg = UBXMessage.config_set(layers, transaction, cfg_data)
-        self._send_data(msg.serialize())
-        logger.debug("Sent config data to set measurement rate, navigation rate and navigation priority rate.")
-        
-    def _enable_in_rtcm(self, enable: bool):
+        return msg.serialize()
+
+    def _cfg_in_rtcm(self, enable: bool):
         """
-        Enable RTCM input.
+        Build the config message enabling RTCM input.
         :param bool enable: enable RTCM
+        :return: serialized CFG-VALSET message
         """
-        layers = 1
-        transaction = 0
         cfg_data = []
         for port_type in ("USB", "UART1", "UART2"):
             cfg_data.append((f"CFG_{port_type}INPROT_RTCM3X", enable))
 
-        msg = UBXMessage.config_set(layers, transaction, cfg_data)
-        self._send_data(msg.serialize())
+        return self._config_set(cfg_data)
 
-    def _enable_out_nmea(self, enable: bool):
+    def _cfg_out_nmea(self, enable: bool):
         """
-        Enable NMEA output (only GGA).
+        Build the config message enabling NMEA output (only GGA).
         :param bool enable: enable NMEA
+        :return: serialized CFG-VALSET message
         """
-        layers = 1
-        transaction = 0
         cfg_data = []
         for port_type in ("USB", "UART1"):
             cfg_data.append((f"CFG_{port_type}OUTPROT_NMEA", enable))
@@ -177,28 +195,18 @@ class UbloxGnss:
             cfg_data.append((f"CFG_MSGOUT_NMEA_ID_GST_{port_type}", 0))
             cfg_data.append((f"CFG_MSGOUT_NMEA_ID_GNS_{port_type}", 0))
 
-        msg = UBXMessage.config_set(layers, transaction, cfg_data)
-        self._send_data(msg.serialize())
+        return self._config_set(cfg_data)
 
-    def _enable_out_ubx(self, enable: bool):
+    def _cfg_out_ubx(self, enable: bool):
         """
-        Enable UBX output (only NAV-PVT).
+        Build the config message enabling UBX output (only NAV-PVT).
         :param bool enable: enable UBX
+        :return: serialized CFG-VALSET message
         """
-
-        layers = 1
-        transaction = 0
         cfg_data = []
         for port_type in ("USB", "UART1", "UART2"):
             cfg_data.append((f"CFG_{port_type}OUTPROT_UBX", enable))
             cfg_data.append((f"CFG_MSGOUT_UBX_NAV_PVT_{port_type}", 1 if enable else 0))
             # cfg_data.append((f"CFG_MSGOUT_UBX_NAV_COV_{port_type}", enable))
 
-        msg = UBXMessage.config_set(layers, transaction, cfg_data)
-        self._send_data(msg.serialize())
-    
-        
-        
-    
-    
-        
\ No newline at end of file
+        return self._config_set(cfg_data)
@@ -1,22 +1,26 @@
 from threading import Event, Thread
-from datetime import datetime
-from zoneinfo import ZoneInfo
+from operator import attrgetter
+import logging
 import time
 
 from ublox_gnss_streamer.ublox_gnss import UbloxGnss
 from ublox_gnss_streamer.utils.logger import logger
-from ublox_gnss_streamer.utils.threadsafe_deque import ThreadSafeDeque
-from ublox_gnss_streamer.utils.schemas import GnssDataSchema
+from ublox_gnss_streamer.utils.spsc_ring import DROP_LOG_EVERY, SpscRing
+
+# Fetches (time, lat, lon, quality) from a parsed GGA in one C-level call
+_GGA_FIELDS = attrgetter("time", "lat", "lon", "quality")
+
+# Longest the RTCM writer sleeps on an empty queue before re-checking stop_event
+RTCM_IDLE_WAIT_SECONDS = 0.5
 
 class UbloxGnssWorker:
     def __init__(
         self,
         gnss: UbloxGnss,
         stop_event: Event = None,
-        nmea_queue: ThreadSafeDeque = None,
-        rtcm_queue: ThreadSafeDeque = None,
-        gnss_queue: ThreadSafeDeque = None,
-        poll_interval: float = 1.0,
+        nmea_queue: SpscRing = None,
+        rtcm_queue: SpscRing = None,
+        gnss_queue: SpscRing = None,
         frame_rate_interval: float = 1.0,  # New: how often to report frame rate
     ):
         self.ublox_gnss = gnss
@@ -26,134 +30,183 @@ class UbloxGnssWorker:
         self.rtcm_queue = rtcm_queue
         self.gnss_queue = gnss_queue
 
-        self.poll_interval = poll_interval
         self.frame_rate_interval = frame_rate_interval  # New
         self._thread = None
+        self._rtcm_thread = None
+
+    def _handle_gngga(self, raw, parsed):
+        """Queue a GGA fix and forward the sentence; returns True if the frame counts."""
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Parsed GNGGA: %s", parsed)
+        # <NMEA(GNGGA, time=07:15:58.300000, lat=36.1166575, NS=N, lon=128.364614, EW=E, quality=1, numSV=12, HDOP=0.56, alt=68.2, altUnit=M, sep=22.3, sepUnit=M, diffAge=, diffStation=)>
+        # Read the fields in one go; a GGA missing one is the rare case, so it
+        # costs one AttributeError instead of four hasattr() calls on every fix
+        try:
+            gnss_time, lat_val, lon_val, quality = _GGA_FIELDS(parsed)
+            has_fields = True
+        except AttributeError:
+            has_fields = False
+
+        if has_fields:
+            # A GGA without a fix leaves lat/lon as empty strings, on every
+            # sentence until the receiver locks; reject those before float() so
+            # a cold start does not raise and catch a ValueError per message.
+            # (Not a truthiness test: 0.0 is a valid coordinate.)
+            if lat_val == "" or lon_val == "":
+                logger.debug("Skipping GNSS data with empty lat/lon (no fix)")
+                return False
+
+            # Validate lat/lon values before processing. float() is a no-op
+            # copy for the floats pynmeagps returns and rejects anything else
+            # that is not numeric
+            try:
+                lat_float = float(lat_val)
+                lon_float = float(lon_val)
+            except (ValueError, TypeError) as e:
+                logger.debug("Skipping GNSS data with invalid lat/lon: lat=%r, lon=%r, error=%s", lat_val, lon_val, e)
+                return False
+
+            # Basic range validation for lat/lon (also rejects NaN)
+            if not (-90.0 <= lat_float <= 90.0 and -180.0 <= lon_float <= 180.0):
+                logger.debug("Skipping GNSS data with out-of-range lat/lon: lat=%s, lon=%s", lat_float, lon_float)
+                return False
+
+            gnss_data = {
+                "timestamp": time.time(),  # Use system time; or parsed.time if you want GNSS time
+                "gnss_time": gnss_time,
+                "lat": lat_float,  # Use validated float value
+                "lon": lon_float,  # Use validated float value
+                "quality": quality,
+            }
+            gnss_queue = self.gnss_queue
+            if not gnss_queue.try_push(gnss_data) and gnss_queue.dropped % DROP_LOG_EVERY == 1:
+                logger.warning("GNSS queue full (capacity %d); dropped newest fix, %d so far",
+                               gnss_queue.capacity, gnss_queue.dropped)
+        # Forward the sentence as read; NTRIPClient.send_nmea() takes bytes,
+        # so it goes to the caster without a decode/encode round trip
+        if isinstance(raw, bytes):
+            nmea_queue = self.nmea_queue
+            if not nmea_queue.try_push(raw) and nmea_queue.dropped % DROP_LOG_EVERY == 1:
+                logger.warning("NMEA queue full (capacity %d); dropped newest sentence, %d so far",
+                               nmea_queue.capacity, nmea_queue.dropped)
+        return True
+
+    # def _handle_nav_pvt(self, raw, parsed):
+    #     logger.debug(f"Parsed NAV-PVT: {parsed}")
+    #     if hasattr(parsed, "lat") and hasattr(parsed, "lon") \
+    #         and hasattr(parsed, "hMSL") and hasattr(parsed, "height") \
+    #         and hasattr(parsed, "carrSoln") and hasattr(parsed, "fixType") \
+    #         and hasattr(parsed, "gnssFixOk"):
+    #         # gnss_json = GnssDataSchema(
+    #         #     timestamp=datetime.now(ZoneInfo('Asia/Seoul')).strftime('%Y-%m-%d %H:%M:%S.%f')[:-3],
+    #         #     lat=parsed.lat,
+    #         #     lon=parsed.lon,
+    #         #     h_msl=parsed.hMSL / 1000.0,  # Convert to meters
+    #         #     fix_type=parsed.fixType,
+    #         #     carr_soln=parsed.carrSoln,
+    #         #     gnss_fix_ok=parsed.gnssFixOk
+    #         # ).json()
+    #         # logger.debug(f"GNSS JSON Data: {gnss_json}")
+    #         # self.gnss_queue.try_push(gnss_json)
+    #         gnss_data = {
+    #             "timestamp": time.time(),  # Use system time; or parsed.iTOW if you want GNSS time
+    #             "gnss_time": f"{parsed.hour:02d}:{parsed.min:02d}:{parsed.second:02d}.{parsed.iTOW % 1000:03d}000",
+    #             "lat": parsed.lat,
+    #             "lon": parsed.lon,
+    #             # Optionally, keep both altitudes:
+    #             "hMSL": parsed.hMSL / 1000.0,
+    #             "height": parsed.height / 1000.0,  # Ellipsoid height
+    #             "carrSoln": parsed.carrSoln,
+    #             "fixType": parsed.fixType,
+    #             "gnssFixOk": parsed.gnssFixOk,
+    #             # Velocity: convert from NED (cm/s) to ENU (m/s)
+    #             "velE": parsed.velE / 100.0,        # East (cm/s to m/s)
+    #             "velN": parsed.velN / 100.0,        # North (cm/s to m/s)
+    #             "velD": parsed.velD / 100.0,       # Up = -Down (cm/s to m/s)
+    #             "gSpeed": parsed.gSpeed / 100.0,     # Ground speed (cm/s to m/s), optional
+    #         }
+    #         self.gnss_queue.try_push(gnss_data)
+    #         return True
+    #     return False
 
     def _worker_loop(self):
-        # nav_pvt_count = 0
+        # The rate window runs on monotonic integer nanoseconds: one clock read and one
+        # int compare per message, immune to wall-clock steps
+        monotonic_ns = time.monotonic_ns
+        interval_ns = int(self.frame_rate_interval * 1e9)
         gngga_count = 0
-        last_rate_time = time.time()
+        last_rate_ns = monotonic_ns()
+        next_report_ns = last_rate_ns + interval_ns
+
+        # Handlers by message identity; anything else the receiver emits is ignored
+        handlers = {
+            "GNGGA": self._handle_gngga,
+            # "NAV-PVT": self._handle_nav_pvt,
+        }
+        get_handler = handlers.get
+
+        # Bind the per-message calls once instead of resolving them on every read
+        poll = self.ublox_gnss.poll
+        stopped = self.stop_event.is_set
 
         try:
-            while not self.stop_event.is_set():
-                raw, parsed = self.ublox_gnss.poll()
-                if parsed and hasattr(parsed, "identity"):
-                    # print only aviable identities
-                    # logger.debug(f"Received parsed data: {parsed.identity}")
-                    
-                    # if parsed.identity == "NAV-PVT":
-                    #     logger.debug(f"Parsed NAV-PVT: {parsed}")
-                    #     if hasattr(parsed, "lat") and hasattr(parsed, "lon") \
-                    #         and hasattr(parsed, "hMSL") and hasattr(parsed, "height") \
-                    #         and hasattr(parsed, "carrSoln") and hasattr(parsed, "fixType") \
-                    #         and hasattr(parsed, "gnssFixOk"):
-                    #         # gnss_json = GnssDataSchema(
-                    #         #     timestamp=datetime.now(ZoneInfo('Asia/Seoul')).strftime('%Y-%m-%d %H:%M:%S.%f')[:-3],
-                    #         #     lat=parsed.lat,
-                    #         #     lon=parsed.lon,
-                    #         #     h_msl=parsed.hMSL / 1000.0,  # Convert to meters
-                    #         #     fix_type=parsed.fixType,
-                    #         #     carr_soln=parsed.carrSoln,
-                    #         #     gnss_fix_ok=parsed.gnssFixOk
-                    #         # ).json()
-                    #         # logger.debug(f"GNSS JSON Data: {gnss_json}")
-                    #         # self.gnss_queue.append(gnss_json)
-                    #         gnss_data = {
-                    #             "timestamp": time.time(),  # Use system time; or parsed.iTOW if you want GNSS time
-                    #             "gnss_time": f"{parsed.hour:02d}:{parsed.min:02d}:{parsed.second:02d}.{parsed.iTOW % 1000:03d}000",
-                    #             "lat": parsed.lat,
-                    #             "lon": parsed.lon,
-                    #             # Optionally, keep both altitudes:
-                    #             "hMSL": parsed.hMSL / 1000.0,
-                    #             "height": parsed.height / 1000.0,  # Ellipsoid height
-                    #             "carrSoln": parsed.carrSoln,
-                    #             "fixType": parsed.fixType,
-                    #             "gnssFixOk": parsed.gnssFixOk,
-                    #             # Velocity: convert from NED (cm/s) to ENU (m/s)
-                    #             "velE": parsed.velE / 100.0,        # East (cm/s to m/s)
-                    #             "velN": parsed.velN / 100.0,        # North (cm/s to m/s)
-                    #             "velD": parsed.velD / 100.0,       # Up = -Down (cm/s to m/s)
-                    #             "gSpeed": parsed.gSpeed / 100.0,     # Ground speed (cm/s to m/s), optional
-                    #         }
-                    #         self.gnss_queue.append(gnss_data)
-                    #         nav_pvt_count += 1  # Increment NAV-PVT frame count
-                            
-                    if parsed.identity == "GNGGA":
-                        logger.debug(f"Parsed GNGGA: {parsed}")
-                        # <NMEA(GNGGA, time=07:15:58.300000, lat=36.1166575, NS=N, lon=128.364614, EW=E, quality=1, numSV=12, HDOP=0.56, alt=68.2, altUnit=M, sep=22.3, sepUnit=M, diffAge=, diffStation=)>
-                        if hasattr(parsed, "time") and hasattr(parsed, "lat") and hasattr(parsed, "lon") \
-                            and hasattr(parsed, "quality"):
-                            
-                            # Validate lat/lon values before processing
-                            try:
-                                lat_val = parsed.lat
-                                lon_val = parsed.lon
-                                
-                                # Skip if lat/lon are empty strings, None, or not convertible to float
-                                if lat_val is None or lon_val is None or lat_val == '' or lon_val == '':
-                                    logger.debug(f"Skipping GNSS data with invalid lat/lon: lat={lat_val}, lon={lon_val}")
-                                    continue
-                                
-                                # Try to convert to float to validate
-                                lat_float = float(lat_val)
-                                lon_float = float(lon_val)
-                                
-                                # Basic range validation for lat/lon
-                                if not (-90 <= lat_float <= 90) or not (-180 <= lon_float <= 180):
-                                    logger.debug(f"Skipping GNSS data with out-of-range lat/lon: lat={lat_float}, lon={lon_float}")
-                                    continue
-                                    
-                            except (ValueError, TypeError) as e:
-                                logger.debug(f"Skipping GNSS data with non-numeric lat/lon: lat={lat_val}, lon={lon_val}, error={e}")
-                                continue
-                            
-                            gnss_data = {
-                                "timestamp": time.time(),  # Use system time; or parsed.time if you want GNSS time
-                                "gnss_time": parsed.time,
-                                "lat": lat_float,  # Use validated float value
-                                "lon": lon_float,  # Use validated float value
-                                "quality": parsed.quality,
-                            }
-                            self.gnss_queue.append(gnss_data)
-                        # If parsed is bytes, decode; otherwise, convert to string
-                        if isinstance(raw, bytes):
-                            self.nmea_queue.append(
-                                raw.decode('utf-8', errors='replace'))
-                            
-                        gngga_count += 1  # Increment GNGGA frame count
+            while not stopped():
+                raw, parsed = poll()
+                # Read the identity once; messages without one (or no message) give None,
+                # which has no handler
+                handler = get_handler(getattr(parsed, "identity", None))
+                if handler is not None and handler(raw, parsed):
+                    gngga_count += 1  # Increment GNGGA frame count
 
                 # Frame rate reporting
-                now = time.time()
-                if now - last_rate_time >= self.frame_rate_interval:
-                    frame_rate = gngga_count / (now - last_rate_time)
-                    logger.info(f"GNGGA frame rate: {frame_rate:.2f} Hz")
+                now_ns = monotonic_ns()
+                if now_ns >= next_report_ns:
+                    if logger.isEnabledFor(logging.INFO):
+                        logger.info("GNGGA frame rate: %.2f Hz", gngga_count * 1e9 / (now_ns - last_rate_ns))
                     gngga_count = 0
-                    last_rate_time = now
-
-                # Send any pending RTCM messages
-                while self.rtcm_queue:
-                    rtcm = self.rtcm_queue.popleft()
-                    self.ublox_gnss.send_rtcm(rtcm)
-                    logger.debug(f"RTCM message sent: {rtcm}")
+                    last_rate_ns = now_ns
+                    next_report_ns = now_ns + interval_ns
 
-                # Wait for the next poll interval, but allow prompt shutdown
-                if self.stop_event.wait(self.poll_interval):
-                    break
+                # No pacing sleep: poll() blocks in the serial read until a message or the
+                # port timeout, so the loop runs at the rate messages arrive
         except Exception as e:
             logger.error(f"Worker loop error: {e}", exc_info=True)
 
+    def _rtcm_writer_loop(self):
+        # Runs beside the reader so a slow serial write never delays GGA ingestion
+        # and a read blocked on the port never delays corrections
+        try:
+            while not self.stop_event.is_set():
+                if not self.rtcm_queue.wait(RTCM_IDLE_WAIT_SECONDS):
+                    continue
+                # Frames are self-delimiting, so the whole backlog goes to the
+                # receiver in one serial write
+                rtcm_frames = self.rtcm_queue.drain()
+                if rtcm_frames:
+                    rtcm = rtcm_frames[0] if len(rtcm_frames) == 1 else b"".join(rtcm_frames)
+                    self.ublox_gnss.send_rtcm(rtcm)
+                    if logger.isEnabledFor(logging.DEBUG):
+                        logger.debug("RTCM messages sent: %d frames, %d bytes", len(rtcm_frames), len(rtcm))
+        except Exception as e:
+            logger.error(f"RTCM writer loop error: {e}", exc_info=True)
+
     def run(self):
         self.ublox_gnss.connect()
         self.ublox_gnss.config()
 
         self._thread = Thread(target=self._worker_loop, daemon=True)
         self._thread.start()
+        if self.rtcm_queue is not None:
+            self._rtcm_thread = Thread(target=self._rtcm_writer_loop, daemon=True)
+            self._rtcm_thread.start()
         logger.info("Ublox GNSS worker started.")
         return True
 
     def stop(self):
         self.stop_event.set()
+        if self._rtcm_thread is not None:
+            self.rtcm_queue.wake()
+            self._rtcm_thread.join()
         if self._thread is not None:
             self._thread.join()
         self.ublox_gnss.disconnect()
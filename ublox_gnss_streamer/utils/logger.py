@@ -1,5 +1,6 @@
 import datetime
 import logging
+import sys
 import termcolor
 
 
@@ -29,7 +30,8 @@ class ColoredFormatter(logging.Formatter):
                 )
 
             record.levelname2 = colored(f"{record.levelname:<7}")
-            record.message2 = colored(record.msg)
+            # getMessage() merges lazy %-style args, which record.msg alone would drop
+            record.message2 = colored(record.getMessage())
 
             asctime2 = datetime.datetime.fromtimestamp(record.created)
             record.asctime2 = termcolor.colored(asctime2, color="green")
@@ -57,4 +59,26 @@ class ColoredLogger(logging.Logger):
 
 
 logger = logging.getLogger("ublox_gnss_streamer")
-logger.__class__ = ColoredLogger
\ No newline at end of file
+logger.__class__ = ColoredLogger
+
+# Level names resolved to logging ints, so repeated configure() calls skip the getattr
+_LEVEL_CACHE = {}
+_stdout_handler = None
+
+
+def configure(level_name="info"):
+    """
+    Set the package logger level and install the colored stdout handler.
+    Safe to call repeatedly: the handler is created and attached only once.
+    """
+    global _stdout_handler
+    level = _LEVEL_CACHE.get(level_name)
+    if level is None:
+        level = _LEVEL_CACHE.setdefault(level_name, getattr(logging, level_name.upper()))
+    logger.setLevel(level)
+    if _stdout_handler is None and not logger.hasHandlers():
+        _stdout_handler = logging.StreamHandler(sys.stdout)
+        _stdout_handler.setFormatter(ColoredFormatter(ColoredLogger.FORMAT))
+        logger.addHandler(_stdout_handler)
+    if _stdout_handler is not None:
+        _stdout_handler.setLevel(level)
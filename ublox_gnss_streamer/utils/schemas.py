@@ -1,6 +1,6 @@
 from pydantic import BaseModel
 from datetime import datetime
-from typing import Literal
+from typing import Literal, NamedTuple, Optional
 
 class GnssDataSchema(BaseModel):
     timestamp: datetime
@@ -17,3 +17,16 @@ class GnssDataSchema(BaseModel):
     #     'fixed-rtk',        # RTK fixed solution
     #     'dead-reckoning'    # Dead reckoning or combined solution
     # ]
+
+
+class ExtraSample(NamedTuple):
+    """
+    A GNSS fix or extrapolated position passed from the extrapolator worker
+    to the TCP publisher, as a plain tuple with named fields.
+    """
+    timestamp: float
+    gnss_time: Optional[str]
+    lat: float
+    lon: float
+    quality: Optional[int]
+    extrapolated: bool
@@ -0,0 +1,113 @@
+import threading
+
+# Producers log the first rejected push and then one in this many, so a stalled
+# consumer is visible without a warning per item
+DROP_LOG_EVERY = 100
+
+class SpscRing:
+    """Bounded single-producer/single-consumer ring buffer.
+
+    Slots are preallocated and addressed with a power-of-two mask. Only the
+    producer advances ``_tail`` and only the consumer advances ``_head``; each
+    index is a single attribute store, which the GIL makes atomic, so neither
+    side takes a lock.
+
+    When the ring is full ``try_push()`` rejects the new item and returns
+    False; evicting the oldest would mean the producer moving ``_head``,
+    which only the consumer may do. Rejections are counted in ``dropped``
+    and producers are expected to check the result.
+
+    A consumer may block in ``wait()`` until the producer pushes; the
+    producer only touches the underlying Event when it is not already set.
+    """
+
+    def __init__(self, capacity=128, debug=False):
+        if capacity < 1 or capacity & (capacity - 1):
+            raise ValueError(f"SpscRing capacity must be a power of two, got {capacity}")
+        self._slots = [None] * capacity
+        self._mask = capacity - 1
+        self._capacity = capacity
+        self._head = 0
+        self._tail = 0
+        self._dropped = 0
+        self._debug = debug
+        self._producer = None
+        self._consumer = None
+        self._ready = threading.Event()
+
+    @property
+    def capacity(self):
+        return self._capacity
+
+    @property
+    def dropped(self):
+        """Number of pushes rejected because the ring was full (producer-owned)."""
+        return self._dropped
+
+    def _check_side(self, attr):
+        ident = threading.get_ident()
+        owner = getattr(self, attr)
+        if owner is None:
+            setattr(self, attr, ident)
+        else:
+            assert owner == ident, f"SpscRing {attr[1:]} used from more than one thread"
+
+    def try_push(self, item):
+        if self._debug:
+            self._check_side('_producer')
+        tail = self._tail
+        if tail - self._head >= self._capacity:
+            self._dropped += 1
+            return False
+        self._slots[tail & self._mask] = item
+        self._tail = tail + 1
+        # Publish the slot before checking the flag so a concurrent wait() cannot miss it
+        if not self._ready.is_set():
+            self._ready.set()
+        return True
+
+    def try_pop(self):
+        if self._debug:
+            self._check_side('_consumer')
+        head = self._head
+        if head == self._tail:
+            return None
+        idx = head & self._mask
+        item = self._slots[idx]
+        self._slots[idx] = None
+        self._head = head + 1
+        return item
+
+    def drain(self):
+        if self._debug:
+            self._check_side('_consumer')
+        head = self._head
+        tail = self._tail
+        if head == tail:
+            return []
+        slots = self._slots
+        mask = self._mask
+        items = []
+        for i in range(head, tail):
+            idx = i & mask
+            items.append(slots[idx])
+            slots[idx] = None
+        self._head = tail
+        return items
+
+    def wait(self, timeout=None):
+        """Block the consumer until the ring is non-empty, wake() is called, or timeout."""
+        self._ready.clear()
+        if self._head != self._tail:
+            return True
+        return self._ready.wait(timeout)
+
+    def wake(self):
+        """Release a consumer blocked in wait(), e.g. on shutdown."""
+        self._ready.set()
+
+    def __len__(self):
+        return self._tail - self._head
+
+    def is_empty(self):
+        return self._head == self._tail